@@ -3,12 +3,27 @@
 
 from __future__ import annotations
 
+import codecs
+from dataclasses import dataclass
+import http.client
 import json
+import queue
+import random
+import re
+import ssl
+import threading
+import time
 from datetime import datetime
 from hashlib import sha1
-import urllib.error
-import urllib.request
+from operator import itemgetter
 from typing import Any
+from urllib.parse import urlsplit
+import zlib
+
+try:
+    import brotli as _brotli
+except ImportError:
+    _brotli = None
 
 LOGIN_URL = "https://mieterportal.mess-profis.de/api/Mieter/Login"
 SUPPORTED_METRICS: tuple[str, ...] = (
@@ -17,6 +32,15 @@ SUPPORTED_METRICS: tuple[str, ...] = (
     "warmwasser",
     "warmwasserM3",
 )
+READ_CHUNK_SIZE = 64 * 1024
+ACCEPT_ENCODING = "gzip, deflate, br" if _brotli is not None else "gzip, deflate"
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 30
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_APARTMENT_FIELDS = ("title1", "title2", "status")
+_SECTION_FIELDS = ("monate", "jahreswert")
+_MONTH_FIELDS = ("datum", "wert", "enthaeltSchaetzung")
 
 
 class ApiClientError(Exception):
@@ -27,6 +51,107 @@ class ApiAuthError(ApiClientError):
     """Authentication failure."""
 
 
+class ApiTransientError(ApiClientError):
+    """Network or server failure that may succeed on retry."""
+
+
+class ApiCircuitOpenError(ApiClientError):
+    """Request rejected because the host failed repeatedly."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Bounded exponential backoff with full jitter."""
+
+    attempts: int = 3
+    base_delay: float = 2.0
+    max_delay: float = 30.0
+
+    def delay(self, retry: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))
+
+
+class CircuitBreaker:
+    """Thread-safe breaker that fails fast after repeated failures of a host."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 600.0) -> None:
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self.opened = 0
+        self.rejected = 0
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == "closed":
+                return True
+            # A probe that never reported back expires as well.
+            if (now := time.monotonic()) - self._opened_at >= self._reset_timeout:
+                self._state = "half_open"
+                self._opened_at = now
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self._failure_threshold:
+                if self._state != "open":
+                    self.opened += 1
+                self._state = "open"
+                self._opened_at = time.monotonic()
+
+    def as_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "times_opened": self.opened,
+                "rejected_requests": self.rejected,
+            }
+
+
+_BREAKERS: dict[str, CircuitBreaker] = {}
+_STATS_LOCK = threading.Lock()
+_STATS = {
+    "requests": 0,
+    "retries": 0,
+    "connections_opened": 0,
+    "bytes_received": 0,
+    "bytes_decoded": 0,
+}
+
+
+def _breaker(host: str) -> CircuitBreaker:
+    with _STATS_LOCK:
+        if host not in _BREAKERS:
+            _BREAKERS[host] = CircuitBreaker()
+        return _BREAKERS[host]
+
+
+def _count(key: str, amount: int = 1) -> None:
+    with _STATS_LOCK:
+        _STATS[key] += amount
+
+
+def resilience_diagnostics() -> dict[str, Any]:
+    """Return request/transfer counters and circuit breaker state per host."""
+    with _STATS_LOCK:
+        breakers = dict(_BREAKERS)
+        stats = dict(_STATS)
+    stats["circuit_breakers"] = {host: breaker.as_dict() for host, breaker in breakers.items()}
+    return stats
+
+
 def _parse_iso_date(date_str: str) -> datetime:
     return datetime.fromisoformat(date_str)
 
@@ -38,30 +163,51 @@ def _safe_float(value: Any) -> float | None:
         return None
 
 
+def _month_key(datum: str) -> str:
+    if len(datum) == 10:
+        return f"{datum}T00:00:00"
+    if len(datum) > 10 and datum[10] == " ":
+        return f"{datum[:10]}T{datum[11:]}"
+    return datum
+
+
+def _month_summary(month: dict[str, Any]) -> dict[str, Any] | None:
+    try:
+        datum = str(month["datum"])
+        _parse_iso_date(datum)
+        wert = float(month["wert"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return {
+        "value": wert,
+        "date": datum,
+        "estimated": bool(month.get("enthaeltSchaetzung", False)),
+    }
+
+
 def _latest_month_value(section: dict[str, Any]) -> dict[str, Any] | None:
     monate = section.get("monate", [])
     if not isinstance(monate, list) or not monate:
         return None
 
-    valid_entries: list[tuple[datetime, str, float, bool]] = []
-    for month in monate:
-        if not isinstance(month, dict):
-            continue
-        try:
-            datum = str(month["datum"])
-            parsed_date = _parse_iso_date(datum)
-            wert = float(month["wert"])
-        except (KeyError, TypeError, ValueError):
-            continue
-        estimated = bool(month.get("enthaeltSchaetzung", False))
-        valid_entries.append((parsed_date, datum, wert, estimated))
-
-    if not valid_entries:
+    # Find the newest entry by normalized date string first and validate only
+    # that one; the others are looked at, newest first, if it is invalid.
+    keyed = [
+        (_month_key(str(month["datum"])), month)
+        for month in monate
+        if isinstance(month, dict) and "datum" in month
+    ]
+    if not keyed:
         return None
-
-    valid_entries.sort(key=lambda item: item[0], reverse=True)
-    _, datum, wert, estimated = valid_entries[0]
-    return {"value": wert, "date": datum, "estimated": estimated}
+    newest = max(keyed, key=itemgetter(0))[1]
+    if (summary := _month_summary(newest)) is not None:
+        return summary
+    # The sort is stable, so of equal dates the first entry is still tried first.
+    keyed.sort(key=itemgetter(0), reverse=True)
+    for _, month in keyed:
+        if month is not newest and (summary := _month_summary(month)) is not None:
+            return summary
+    return None
 
 
 def _apartment_key(title1: str, title2: str, fallback_index: int) -> str:
@@ -71,42 +217,416 @@ def _apartment_key(title1: str, title2: str, fallback_index: int) -> str:
     return sha1(base.encode("utf-8"), usedforsecurity=False).hexdigest()[:12]
 
 
-def fetch_data(email: str, password_hash: str, timeout: int = 30) -> list[dict[str, Any]]:
-    """Fetch raw payload from MessProfis login endpoint."""
-    payload = json.dumps({"Mail": email, "PasswordHash": password_hash}).encode("utf-8")
+def _prune_section(aktuell: Any) -> Any:
+    if not isinstance(aktuell, dict):
+        return aktuell
+    pruned = {key: aktuell[key] for key in _SECTION_FIELDS if key in aktuell}
+    monate = pruned.get("monate")
+    if isinstance(monate, list):
+        pruned["monate"] = [
+            {key: month[key] for key in _MONTH_FIELDS if key in month}
+            if isinstance(month, dict)
+            else month
+            for month in monate
+        ]
+    return pruned
+
+
+def prune_apartment(item: dict[str, Any]) -> dict[str, Any]:
+    """Drop every part of an apartment object that is not summarized."""
+    pruned = {key: item[key] for key in _APARTMENT_FIELDS if key in item}
+    if "werte" not in item:
+        return pruned
+
+    werte = item["werte"]
+    if not isinstance(werte, dict):
+        pruned["werte"] = werte
+        return pruned
+
+    pruned_werte: dict[str, Any] = {}
+    for metric in SUPPORTED_METRICS:
+        if metric not in werte:
+            continue
+        metric_obj = werte[metric]
+        if isinstance(metric_obj, dict) and "aktuell" in metric_obj:
+            metric_obj = {"aktuell": _prune_section(metric_obj["aktuell"])}
+        elif isinstance(metric_obj, dict):
+            metric_obj = {}
+        pruned_werte[metric] = metric_obj
+    pruned["werte"] = pruned_werte
+    return pruned
+
+
+def _is_zlib_header(data: bytes) -> bool:
+    """Return whether a deflate body starts with a zlib header (RFC 1950)."""
+    cmf, flg = data[0], data[1]
+    return cmf & 0x0F == 8 and cmf >> 4 <= 7 and (cmf << 8 | flg) % 31 == 0
+
+
+class ContentDecoder:
+    """Undo the Content-Encoding of a response body chunk by chunk."""
+
+    def __init__(self, encoding: str | None) -> None:
+        self.encoding = (encoding or "identity").strip().lower() or "identity"
+        self.wire_bytes = 0
+        # The first bytes of a deflate body, until its format is known.
+        self._header: bytes | None = None
+        if self.encoding == "identity":
+            self._decompressor: Any = None
+        elif self.encoding in ("gzip", "x-gzip"):
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self.encoding == "deflate":
+            self._decompressor = None
+            self._header = b""
+        elif self.encoding == "br" and _brotli is not None:
+            self._decompressor = _brotli.Decompressor()
+        else:
+            raise ApiClientError(f"Unsupported content encoding: {encoding}")
+
+    def decompress(self, chunk: bytes) -> bytes:
+        """Return the decoded bytes of the next raw chunk."""
+        self.wire_bytes += len(chunk)
+        if self._header is not None:
+            # Some servers send "deflate" without the zlib header; the first
+            # two bytes tell the formats apart, however the body is chunked.
+            chunk = self._header + chunk
+            if len(chunk) < 2:
+                self._header = chunk
+                return b""
+            self._header = None
+            self._decompressor = zlib.decompressobj(
+                zlib.MAX_WBITS if _is_zlib_header(chunk) else -zlib.MAX_WBITS
+            )
+        if self._decompressor is None:
+            return chunk
+        try:
+            if self.encoding == "br":
+                return self._decompressor.process(chunk)
+            return self._decompressor.decompress(chunk)
+        except zlib.error as err:
+            raise ApiClientError(f"Invalid {self.encoding} response body") from err
+        except Exception as err:
+            if _brotli is not None and isinstance(err, _brotli.error):
+                raise ApiClientError("Invalid br response body") from err
+            raise
+
+    def flush(self) -> bytes:
+        """Return any buffered output and check the stream was complete."""
+        if self._header is not None:
+            raise ApiClientError(f"Truncated {self.encoding} response body")
+        if self._decompressor is None:
+            return b""
+        if self.encoding == "br":
+            if not self._decompressor.is_finished():
+                raise ApiClientError("Truncated br response body")
+            return b""
+        tail = self._decompressor.flush()
+        if not self._decompressor.eof:
+            raise ApiClientError(f"Truncated {self.encoding} response body")
+        return tail
+
+
+class PayloadStreamDecoder:
+    """Decode the top-level payload list chunk by chunk, one apartment at a time."""
+
+    def __init__(self) -> None:
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._started = False
+        self._finished = False
+        self._expect_item = True
+        self._retry_at = 0
+        self.items: list[dict[str, Any]] = []
+        self.bytes_read = 0
+
+    def feed(self, chunk: bytes) -> None:
+        """Consume the next chunk of the raw response body."""
+        self.bytes_read += len(chunk)
+        self._buffer += self._decode_text(chunk, final=False)
+        self._drain(final=False)
+
+    def finish(self) -> list[dict[str, Any]]:
+        """Flush the remaining input and return the pruned apartment list."""
+        self._buffer += self._decode_text(b"", final=True)
+        self._drain(final=True)
+        if not self._finished:
+            raise ApiClientError("Invalid JSON response")
+        return self.items
+
+    def _decode_text(self, chunk: bytes, final: bool) -> str:
+        try:
+            return self._text.decode(chunk, final=final)
+        except UnicodeDecodeError as err:
+            raise ApiClientError("Invalid JSON response") from err
+
+    def _drain(self, final: bool) -> None:
+        buffer = self._buffer
+        pos = 0
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+            if self._finished:
+                raise ApiClientError("Invalid JSON response")
+            if not self._started:
+                if buffer[pos] != "[":
+                    raise ApiClientError("Unexpected API format, expected a list")
+                self._started = True
+                pos += 1
+                continue
+            if not self._expect_item:
+                if buffer[pos] == ",":
+                    self._expect_item = True
+                elif buffer[pos] == "]":
+                    self._finished = True
+                else:
+                    raise ApiClientError("Invalid JSON response")
+                pos += 1
+                continue
+            if buffer[pos] == "]" and not self.items:
+                self._finished = True
+                pos += 1
+                continue
+            # Retry an incomplete element only once the buffer has doubled.
+            if not final and len(buffer) - pos < self._retry_at:
+                break
+            try:
+                item, end = self._json.raw_decode(buffer, pos)
+            except json.JSONDecodeError as err:
+                if final:
+                    raise ApiClientError("Invalid JSON response") from err
+                self._retry_at = 2 * (len(buffer) - pos)
+                break
+            if not isinstance(item, dict):
+                raise ApiClientError("Unexpected API format, expected list of objects")
+            self.items.append(prune_apartment(item))
+            self._retry_at = 0
+            self._expect_item = False
+            pos = end
+        self._buffer = buffer[pos:]
+
+
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
 
-    request = urllib.request.Request(
-        LOGIN_URL,
-        data=payload,
-        method="POST",
-        headers={
+class MessProfisHttpClient:
+    """Reusable client that keeps connections to the portal alive.
+
+    Idle connections are pooled and handed to one thread at a time, so a
+    single instance can be shared by worker threads. Transient failures are
+    retried with exponential backoff; a per-host circuit breaker rejects
+    requests while the host keeps failing.
+    """
+
+    def __init__(
+        self,
+        url: str = LOGIN_URL,
+        max_idle_connections: int = 8,
+        timeout: float = READ_TIMEOUT,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        retry_policy: RetryPolicy | None = None,
+        ssl_context: ssl.SSLContext | None = None,
+    ) -> None:
+        parts = urlsplit(url)
+        self._https = parts.scheme == "https"
+        self._netloc = parts.netloc
+        self._path = parts.path or "/"
+        self._timeout = timeout
+        self._connect_timeout = connect_timeout
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._ssl_context = ssl_context
+        self._idle: queue.LifoQueue[http.client.HTTPConnection] = queue.LifoQueue(
+            maxsize=max_idle_connections
+        )
+        self._breaker = _breaker(self._netloc)
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.connections_reused = 0
+
+    def __enter__(self) -> MessProfisHttpClient:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def fetch(
+        self,
+        email: str,
+        password_hash: str,
+        retry_policy: RetryPolicy | None = None,
+    ) -> list[dict[str, Any]]:
+        """Fetch the pruned payload of one account."""
+        body = json.dumps({"Mail": email, "PasswordHash": password_hash}).encode("utf-8")
+        policy = retry_policy or self._retry_policy
+
+        retry = 0
+        while True:
+            if not self._breaker.allow_request():
+                raise ApiCircuitOpenError(
+                    "Host failed repeatedly, not sending requests for now"
+                )
+            try:
+                result = self._post(body)
+            except ApiTransientError:
+                self._breaker.record_failure()
+                if retry + 1 >= policy.attempts:
+                    raise
+                _count("retries")
+                time.sleep(policy.delay(retry))
+                retry += 1
+                continue
+            except ApiClientError:
+                self._breaker.record_success()
+                raise
+            except Exception:
+                self._breaker.record_failure()
+                raise
+            self._breaker.record_success()
+            return result
+
+    def _acquire(self) -> tuple[http.client.HTTPConnection, bool]:
+        """Return an idle connection or a new one, and whether it is reused."""
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        else:
+            with self._lock:
+                self.connections_reused += 1
+            return connection, True
+        return self._connect(), False
+
+    def _connect(self) -> http.client.HTTPConnection:
+        """Open a new connection to the portal."""
+        if self._https:
+            connection: http.client.HTTPConnection = http.client.HTTPSConnection(
+                self._netloc, timeout=self._connect_timeout, context=self._ssl_context
+            )
+        else:
+            connection = http.client.HTTPConnection(
+                self._netloc, timeout=self._connect_timeout
+            )
+        connection.connect()
+        connection.sock.settimeout(self._timeout)
+        with self._lock:
+            self.connections_opened += 1
+        _count("connections_opened")
+        return connection
+
+    def _release(
+        self, connection: http.client.HTTPConnection, response: http.client.HTTPResponse
+    ) -> None:
+        """Return a fully read connection to the pool, or close it."""
+        if response.will_close:
+            connection.close()
+            return
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def _post(self, body: bytes) -> list[dict[str, Any]]:
+        """Send one POST and stream-decode the response."""
+        headers = {
             "Content-Type": "application/json",
             "Accept": "application/json, text/plain, */*",
+            "Accept-Encoding": ACCEPT_ENCODING,
             "Origin": "https://mieterportal.mess-profis.de",
             "Referer": "https://mieterportal.mess-profis.de/login",
-        },
-    )
-
-    try:
-        with urllib.request.urlopen(request, timeout=timeout) as response:
-            body = response.read().decode("utf-8")
-    except urllib.error.HTTPError as err:
-        if err.code in (401, 403):
-            raise ApiAuthError("Authentication failed") from err
-        raise ApiClientError(f"HTTP error {err.code}") from err
-    except urllib.error.URLError as err:
-        raise ApiClientError(f"Network error: {err.reason}") from err
-
-    try:
-        parsed = json.loads(body)
-    except json.JSONDecodeError as err:
-        raise ApiClientError("Invalid JSON response") from err
-
-    if not isinstance(parsed, list):
-        raise ApiClientError("Unexpected API format, expected a list")
-    if not all(isinstance(item, dict) for item in parsed):
-        raise ApiClientError("Unexpected API format, expected list of objects")
-    return parsed
+        }
+        _count("requests")
+        connection: http.client.HTTPConnection | None = None
+        try:
+            connection, reused = self._acquire()
+            try:
+                connection.request("POST", self._path, body=body, headers=headers)
+                response = connection.getresponse()
+            except _STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                # The server closed an idle keep-alive connection, and likely
+                # the other idle ones with it: drop them and reconnect once.
+                connection.close()
+                connection = None
+                self.close()
+                connection = self._connect()
+                connection.request("POST", self._path, body=body, headers=headers)
+                response = connection.getresponse()
+
+            if response.status >= 400:
+                response.read()
+                self._release(connection, response)
+                connection = None
+                if response.status in (401, 403):
+                    raise ApiAuthError("Authentication failed")
+                if response.status == 429 or response.status >= 500:
+                    raise ApiTransientError(f"HTTP error {response.status}")
+                raise ApiClientError(f"HTTP error {response.status}")
+
+            content = ContentDecoder(response.getheader("Content-Encoding"))
+            decoder = PayloadStreamDecoder()
+            while chunk := response.read(READ_CHUNK_SIZE):
+                decoder.feed(content.decompress(chunk))
+            decoder.feed(content.flush())
+            self._release(connection, response)
+            connection = None
+            _count("bytes_received", content.wire_bytes)
+            _count("bytes_decoded", decoder.bytes_read)
+            return decoder.finish()
+        except (OSError, http.client.HTTPException) as err:
+            if connection is not None:
+                connection.close()
+            raise ApiTransientError(f"Network error: {err}") from err
+        except ApiClientError:
+            # Decoding failed half way; the connection state is unknown.
+            if connection is not None:
+                connection.close()
+            raise
+
+
+_CLIENTS: dict[tuple[str, float, float], MessProfisHttpClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _shared_client(url: str, timeout: float, connect_timeout: float) -> MessProfisHttpClient:
+    with _CLIENTS_LOCK:
+        key = (url, timeout, connect_timeout)
+        if key not in _CLIENTS:
+            _CLIENTS[key] = MessProfisHttpClient(
+                url, timeout=timeout, connect_timeout=connect_timeout
+            )
+        return _CLIENTS[key]
+
+
+def fetch_data(
+    email: str,
+    password_hash: str,
+    timeout: float = READ_TIMEOUT,
+    connect_timeout: float = CONNECT_TIMEOUT,
+    retry_policy: RetryPolicy | None = None,
+    url: str = LOGIN_URL,
+) -> list[dict[str, Any]]:
+    """Fetch the payload from the MessProfis login endpoint, pruned while streaming.
+
+    Uses a process-wide MessProfisHttpClient per endpoint, so repeated calls
+    reuse kept-alive connections.
+    """
+    client = _shared_client(url, timeout, connect_timeout)
+    return client.fetch(email, password_hash, retry_policy=retry_policy)
 
 
 def extract_latest_values(payload: list[dict[str, Any]]) -> list[dict[str, Any]]:
@@ -2,19 +2,81 @@
 
 from __future__ import annotations
 
+import voluptuous as vol
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN
-from .coordinator import MessProfisDataUpdateCoordinator
+from .adaptive import schedule_storage_key
+from .const import (
+    CONF_MAX_CONCURRENT_FETCHES,
+    CONF_MAX_REQUESTS_PER_MINUTE,
+    DEFAULT_MAX_CONCURRENT_FETCHES,
+    DEFAULT_MAX_REQUESTS_PER_MINUTE,
+    DOMAIN,
+    MAX_CONCURRENT_FETCHES,
+    MAX_REQUESTS_PER_MINUTE,
+    STORAGE_VERSION,
+)
+from .coordinator import MessProfisDataUpdateCoordinator, storage_key
+from .hub import async_get_hub
+from .statistics import statistics_storage_key
 
 PLATFORMS: list[str] = ["sensor"]
 
+CONFIG_SCHEMA = vol.Schema(
+    {
+        DOMAIN: vol.Schema(
+            {
+                vol.Optional(
+                    CONF_MAX_CONCURRENT_FETCHES,
+                    default=DEFAULT_MAX_CONCURRENT_FETCHES,
+                ): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=MAX_CONCURRENT_FETCHES)
+                ),
+                vol.Optional(
+                    CONF_MAX_REQUESTS_PER_MINUTE,
+                    default=DEFAULT_MAX_REQUESTS_PER_MINUTE,
+                ): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=MAX_REQUESTS_PER_MINUTE)
+                ),
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up domain-wide settings shared by all accounts."""
+    domain_config = config.get(DOMAIN, {})
+    async_get_hub(hass).async_configure(
+        max_concurrency=domain_config.get(
+            CONF_MAX_CONCURRENT_FETCHES, DEFAULT_MAX_CONCURRENT_FETCHES
+        ),
+        requests_per_minute=domain_config.get(
+            CONF_MAX_REQUESTS_PER_MINUTE, DEFAULT_MAX_REQUESTS_PER_MINUTE
+        ),
+    )
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up MessProfis from a config entry."""
     coordinator = MessProfisDataUpdateCoordinator(hass, entry)
-    await coordinator.async_config_entry_first_refresh()
+    await coordinator.async_load_schedule()
+    cached = await coordinator.async_load_cached()
+    entry.async_on_unload(coordinator.async_track_metric_usage())
+    if not cached:
+        await coordinator.async_config_entry_first_refresh()
+    # Restored accounts start from the persisted readings; the hub refreshes
+    # them shortly after startup, spread out instead of all at once.
+    entry.async_on_unload(
+        async_get_hub(hass).async_register(coordinator, refresh_soon=cached)
+    )
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
@@ -23,9 +85,24 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry so changed options take effect."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id, None)
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove persisted data of a deleted config entry."""
+    for key in (
+        storage_key(entry.entry_id),
+        statistics_storage_key(entry.entry_id),
+        schedule_storage_key(entry.entry_id),
+    ):
+        await Store(hass, STORAGE_VERSION, key).async_remove()
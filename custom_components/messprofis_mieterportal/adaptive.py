@@ -0,0 +1,112 @@
+"""Learn when the portal publishes new values and adapt the poll interval."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ADAPTIVE_DENSE_INTERVAL,
+    ADAPTIVE_MAX_INTERVAL,
+    ADAPTIVE_MAX_OBSERVATIONS,
+    ADAPTIVE_MIN_OBSERVATIONS,
+    ADAPTIVE_WINDOW_MARGIN_DAYS,
+    DOMAIN,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .models import ReadingsSnapshot
+from .parser import month_key
+
+_DAYS_IN_CYCLE = 31
+
+
+def schedule_storage_key(entry_id: str) -> str:
+    """Return the storage key holding an entry's learned publish days."""
+    return f"{DOMAIN}.{entry_id}.schedule"
+
+
+def count_publish_events(
+    previous: ReadingsSnapshot | None, current: ReadingsSnapshot
+) -> int:
+    """Count apartment metrics with a new month or a finalized estimate."""
+    if previous is None:
+        return 0
+
+    events = 0
+    for apartment in current:
+        before = previous.get(apartment.apartment_key)
+        if before is None:
+            continue
+        if before is apartment:
+            continue
+        for value, old in zip(apartment.latest, before.latest):
+            if value is None or old is None:
+                continue
+            new_key, old_key = month_key(value.datum), month_key(old.datum)
+            if new_key > old_key or (
+                new_key == old_key and old.estimated and not value.estimated
+            ):
+                events += 1
+    return events
+
+
+def _day_distance(first: int, second: int) -> int:
+    """Return the distance between two days of month, wrapping at month end."""
+    distance = abs(first - second) % _DAYS_IN_CYCLE
+    return min(distance, _DAYS_IN_CYCLE - distance)
+
+
+class PublishWindowLearner:
+    """Track the days of month on which new values showed up."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, schedule_storage_key(entry_id)
+        )
+        self._days: list[int] = []
+
+    async def async_load(self) -> None:
+        """Restore observations from storage."""
+        stored = await self._store.async_load()
+        if stored:
+            self._days = [int(day) for day in stored.get("days", [])]
+
+    def record(self, when: datetime) -> None:
+        """Remember that new values were detected at the given time."""
+        self._days.append(dt_util.as_local(when).day)
+        del self._days[:-ADAPTIVE_MAX_OBSERVATIONS]
+        self._store.async_delay_save(lambda: {"days": self._days}, STORAGE_SAVE_DELAY)
+
+    def _in_window(self, day: int) -> bool:
+        return any(
+            _day_distance(day, observed) <= ADAPTIVE_WINDOW_MARGIN_DAYS
+            for observed in self._days
+        )
+
+    def next_interval(self, now: datetime, default: timedelta) -> timedelta:
+        """Return how long to wait before the next poll."""
+        if len(self._days) < ADAPTIVE_MIN_OBSERVATIONS:
+            return default
+
+        local_now = dt_util.as_local(now)
+        if self._in_window(local_now.day):
+            return ADAPTIVE_DENSE_INTERVAL
+
+        midnight = local_now.replace(hour=0, minute=0, second=0, microsecond=0)
+        for offset in range(1, _DAYS_IN_CYCLE + 1):
+            window_start = midnight + timedelta(days=offset)
+            if self._in_window(window_start.day):
+                return max(
+                    ADAPTIVE_DENSE_INTERVAL,
+                    min(window_start - local_now, ADAPTIVE_MAX_INTERVAL),
+                )
+        return ADAPTIVE_MAX_INTERVAL
+
+    def as_diagnostics(self) -> dict[str, Any]:
+        """Return learned state for the diagnostics download."""
+        return {"publish_days": list(self._days)}
@@ -0,0 +1,222 @@
+"""Derived consumption figures computed incrementally from monthly series."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Collection, Iterable
+from datetime import datetime
+from functools import lru_cache
+from itertools import accumulate, islice
+from typing import NamedTuple
+
+from .const import SUPPORTED_METRICS
+from .models import ApartmentReading, MonthlySeries
+
+AGGREGATE_MONTH_DELTA = "month_delta"
+AGGREGATE_YEAR_TO_DATE = "year_to_date"
+AGGREGATE_ROLLING_12_MONTHS = "rolling_12_months"
+AGGREGATE_JAHRESWERT_PERCENT = "jahreswert_percent"
+
+AGGREGATES: tuple[str, ...] = (
+    AGGREGATE_MONTH_DELTA,
+    AGGREGATE_YEAR_TO_DATE,
+    AGGREGATE_ROLLING_12_MONTHS,
+    AGGREGATE_JAHRESWERT_PERCENT,
+)
+
+# Prefix sums accumulate rounding noise; results are rounded to this precision.
+_DIGITS = 6
+
+
+class ConsumptionAggregates(NamedTuple):
+    """Derived figures of one metric, relative to its newest month."""
+
+    month: str
+    month_delta: float | None
+    year_to_date: float
+    rolling_12_months: float
+    jahreswert_percent: float | None
+
+    def get(self, aggregate: str) -> float | None:
+        """Return the figure named by one of the AGGREGATE_* constants."""
+        return getattr(self, aggregate)
+
+
+@lru_cache(maxsize=4096)
+def _month_index(datum: str) -> int | None:
+    """Return the running month number of an ISO date, None if it does not parse."""
+    try:
+        parsed = datetime.fromisoformat(datum)
+    except ValueError:
+        return None
+    return parsed.year * 12 + parsed.month - 1
+
+
+@lru_cache(maxsize=256)
+def _month_indices(dates: tuple[str, ...]) -> array | None:
+    """Return running month numbers of ISO dates; series share date tuples.
+
+    Returns None if any date does not parse.
+    """
+    months = array("l")
+    for datum in dates:
+        if (month := _month_index(datum)) is None:
+            return None
+        months.append(month)
+    return months
+
+
+def _datable(series: MonthlySeries) -> MonthlySeries:
+    """Return the series without the months whose date does not parse."""
+    return MonthlySeries.from_values(
+        value for value in series if _month_index(value.datum) is not None
+    )
+
+
+class _SeriesTotals:
+    """Running sums of a series, as of the last update.
+
+    `source` is the series as reported, `series` the datable months of it
+    that the sums cover.
+    """
+
+    __slots__ = ("source", "series", "prefix", "aggregates")
+
+    def __init__(
+        self,
+        source: MonthlySeries,
+        series: MonthlySeries,
+        prefix: array,
+        aggregates: ConsumptionAggregates | None,
+    ) -> None:
+        self.source = source
+        self.series = series
+        self.prefix = prefix
+        self.aggregates = aggregates
+
+
+def _common_prefix(old: MonthlySeries, new: MonthlySeries) -> int:
+    """Return how many leading months two series share unchanged."""
+    limit = min(len(old), len(new))
+    if old.values[:limit] == new.values[:limit] and (
+        old.dates is new.dates or old.dates[:limit] == new.dates[:limit]
+    ):
+        # Months were only appended or removed at the end.
+        return limit
+    index = 0
+    while (
+        index < limit
+        and old.dates[index] == new.dates[index]
+        and old.values[index] == new.values[index]
+    ):
+        index += 1
+    return index
+
+
+class ConsumptionEngine:
+    """Keep running sums per apartment metric and derive consumption figures.
+
+    A series that is the identical object of the previous refresh is not
+    looked at again; for a changed series the sums are only recomputed from
+    the first appended or revised month on.
+    """
+
+    def __init__(self) -> None:
+        self._totals: dict[tuple[str, str], _SeriesTotals] = {}
+        self.months_processed = 0
+
+    def update(
+        self, apartment: ApartmentReading, metrics: Collection[str] = SUPPORTED_METRICS
+    ) -> tuple[ConsumptionAggregates | None, ...]:
+        """Return the aggregates of every metric of an apartment, in slot order.
+
+        Metrics not in `metrics` are not aggregated; their slots are None.
+        """
+        apartment_key = apartment.apartment_key
+        aggregates: list[ConsumptionAggregates | None] = []
+        for metric, series, annual in zip(
+            SUPPORTED_METRICS, apartment.series, apartment.annual
+        ):
+            if metric in metrics:
+                aggregates.append(
+                    self._update_series(apartment_key, metric, series, annual)
+                )
+            else:
+                self._totals.pop((apartment_key, metric), None)
+                aggregates.append(None)
+        return tuple(aggregates)
+
+    def forget(self, apartment_keys: Iterable[str]) -> None:
+        """Drop the state of apartments that are no longer reported."""
+        for apartment_key in apartment_keys:
+            for metric in SUPPORTED_METRICS:
+                self._totals.pop((apartment_key, metric), None)
+
+    def _update_series(
+        self,
+        apartment_key: str,
+        metric: str,
+        series: MonthlySeries,
+        annual: float | None,
+    ) -> ConsumptionAggregates | None:
+        key = (apartment_key, metric)
+        totals = self._totals.get(key)
+        if totals is None or totals.source is not series:
+            totals = self._totals[key] = self._recompute(series, totals)
+        aggregates = totals.aggregates
+        if aggregates is None:
+            return None
+        percent = (
+            round(aggregates.rolling_12_months / annual * 100, 1) if annual else None
+        )
+        if percent != aggregates.jahreswert_percent:
+            aggregates = totals.aggregates = aggregates._replace(
+                jahreswert_percent=percent
+            )
+        return aggregates
+
+    def _recompute(
+        self, source: MonthlySeries, previous: _SeriesTotals | None
+    ) -> _SeriesTotals:
+        series = source
+        months = _month_indices(series.dates)
+        if months is None:
+            # Leave out undatable months instead of the whole series.
+            series = _datable(source)
+            months = _month_indices(series.dates)
+        if not series or months is None:
+            return _SeriesTotals(source, series, array("d"), None)
+
+        start = 0
+        if previous is not None and previous.aggregates is not None:
+            start = _common_prefix(previous.series, series)
+        prefix = previous.prefix[:start] if start else array("d")
+        running = prefix[-1] if start else 0.0
+        prefix.extend(
+            islice(accumulate(series.values[start:], initial=running), 1, None)
+        )
+        self.months_processed += len(series) - start
+
+        latest = months[-1]
+        total = prefix[-1]
+
+        def sum_since(first_month: int) -> float:
+            first = bisect_left(months, first_month)
+            return round(total - (prefix[first - 1] if first else 0.0), _DIGITS)
+
+        month_delta = None
+        if len(months) > 1 and months[-2] == latest - 1:
+            values = series.values
+            month_delta = round(values[-1] - values[-2], _DIGITS)
+        aggregates = ConsumptionAggregates(
+            month=series.dates[-1],
+            month_delta=month_delta,
+            year_to_date=sum_since(latest - latest % 12),
+            rolling_12_months=sum_since(latest - 11),
+            jahreswert_percent=None,
+        )
+        return _SeriesTotals(source, series, prefix, aggregates)
+
+    def __len__(self) -> int:
+        return len(self._totals)
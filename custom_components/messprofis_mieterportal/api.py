@@ -2,11 +2,39 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+import logging
+import time
 from typing import Any
+from urllib.parse import urlsplit
 
-from aiohttp import ClientError, ClientResponseError, ClientSession
+from aiohttp import ClientError, ClientResponseError, ClientSession, ClientTimeout, hdrs
 
-from .const import LOGIN_URL
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_TIMEOUT,
+    CONNECT_TIMEOUT,
+    DEFAULT_MAX_CONCURRENT_FETCHES,
+    FETCH_CACHE_TTL,
+    LOGIN_URL,
+    OFFLOAD_MIN_BYTES,
+    READ_TIMEOUT,
+    RETRY_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    TOTAL_TIMEOUT,
+)
+from .decoder import (
+    ACCEPT_ENCODING,
+    READ_CHUNK_SIZE,
+    ContentDecoder,
+    PayloadStreamDecoder,
+)
+from .resilience import CircuitBreaker, RateLimiter, RetryPolicy
+
+_LOGGER = logging.getLogger(__name__)
 
 
 class MessProfisApiError(Exception):
@@ -21,14 +49,187 @@ class MessProfisFormatError(MessProfisApiError):
     """Unexpected response format."""
 
 
+class MessProfisConnectionError(MessProfisApiError):
+    """Transient network or server failure that may succeed on retry."""
+
+
+class MessProfisCircuitOpenError(MessProfisApiError):
+    """Request rejected because the portal failed repeatedly."""
+
+
+@dataclass(frozen=True, slots=True)
+class FetchResult:
+    """Decoded payload together with a digest of the decoded response body.
+
+    `size` counts the decoded body, `wire_size` the bytes actually received.
+    """
+
+    payload: list[dict[str, Any]]
+    digest: str
+    size: int
+    wire_size: int = 0
+    network_time: float = 0.0
+    decode_time: float = 0.0
+
+
+def _feed(
+    decoder: PayloadStreamDecoder, content: ContentDecoder, chunk: bytes
+) -> None:
+    """Decompress one chunk of the body and decode it."""
+    decoder.feed(content.decompress(chunk))
+
+
+def _finish(
+    decoder: PayloadStreamDecoder, content: ContentDecoder
+) -> list[dict[str, Any]]:
+    """Decode the rest of the body and return the apartment list."""
+    decoder.feed(content.flush())
+    return decoder.finish()
+
+
 class MessProfisApiClient:
-    """Small API client for the portal login/data endpoint."""
+    """Small API client for the portal login/data endpoint.
+
+    Responses are requested compressed. Pass a session created with
+    `auto_decompress=False` to have the body decompressed here, where the
+    transferred bytes can be counted; otherwise aiohttp decompresses it and
+    only the decoded size is known. Given an `executor` (such as
+    `hass.async_add_executor_job`), bodies of at least OFFLOAD_MIN_BYTES are
+    decoded there instead of on the event loop.
+    """
 
-    def __init__(self, session: ClientSession) -> None:
+    def __init__(
+        self,
+        session: ClientSession,
+        retry_policy: RetryPolicy | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENT_FETCHES,
+        cache_ttl: float = FETCH_CACHE_TTL,
+        login_url: str = LOGIN_URL,
+        rate_limiter: RateLimiter | None = None,
+        executor: Callable[..., Awaitable[Any]] | None = None,
+    ) -> None:
         self._session = session
+        self.login_url = login_url
+        self._rate_limiter = rate_limiter
+        self._executor = executor
+        self._limiter = asyncio.Semaphore(max_concurrency)
+        self.cache_ttl = cache_ttl
+        self._inflight: dict[tuple[str, str], asyncio.Task[FetchResult]] = {}
+        self._cache: dict[tuple[str, str], tuple[float, FetchResult]] = {}
+        self.coalesced = 0
+        self.cache_hits = 0
+        self._retry_policy = retry_policy or RetryPolicy(
+            attempts=RETRY_ATTEMPTS,
+            base_delay=RETRY_BASE_DELAY,
+            max_delay=RETRY_MAX_DELAY,
+        )
+        self._timeout = ClientTimeout(
+            total=TOTAL_TIMEOUT, connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT
+        )
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._decompress = not getattr(session, "auto_decompress", True)
+        self.requests = 0
+        self.retries = 0
+        self.bytes_received = 0
+        self.bytes_decoded = 0
+        self.decodes_inline = 0
+        self.decodes_offloaded = 0
 
-    async def async_fetch_raw(self, email: str, password_hash: str) -> list[dict[str, Any]]:
-        """Fetch raw payload list from endpoint."""
+    def _breaker(self, url: str) -> CircuitBreaker:
+        """Return the circuit breaker of the URL's host."""
+        host = urlsplit(url).netloc
+        if (breaker := self._breakers.get(host)) is None:
+            breaker = self._breakers[host] = CircuitBreaker(
+                failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                reset_timeout=BREAKER_RESET_TIMEOUT,
+            )
+        return breaker
+
+    def set_max_concurrency(self, max_concurrency: int) -> None:
+        """Limit how many requests may be sent to the portal at once."""
+        self._limiter = asyncio.Semaphore(max_concurrency)
+
+    def set_rate_limiter(self, rate_limiter: RateLimiter | None) -> None:
+        """Cap the request rate, retries included; None removes the cap."""
+        self._rate_limiter = rate_limiter
+
+    async def async_fetch_raw(self, email: str, password_hash: str) -> FetchResult:
+        """Fetch the payload list of an account.
+
+        Concurrent calls for the same account share one request, and a
+        successful result is reused for `cache_ttl` seconds.
+        """
+        key = (email, password_hash)
+        cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.cache_ttl:
+            self.cache_hits += 1
+            return cached[1]
+
+        if (task := self._inflight.get(key)) is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.get_running_loop().create_task(
+                self._async_fetch_with_retries(email, password_hash)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._async_fetch_done(key, done))
+        # Shielded, so one caller being cancelled does not fail the others.
+        return await asyncio.shield(task)
+
+    def _async_fetch_done(
+        self, key: tuple[str, str], task: asyncio.Task[FetchResult]
+    ) -> None:
+        """Release the in-flight slot and cache a successful result."""
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        now = time.monotonic()
+        self._cache = {
+            cached_key: entry
+            for cached_key, entry in self._cache.items()
+            if now - entry[0] < self.cache_ttl
+        }
+        if self.cache_ttl > 0:
+            self._cache[key] = (now, task.result())
+
+    async def _async_fetch_with_retries(
+        self, email: str, password_hash: str
+    ) -> FetchResult:
+        """Fetch the payload list, retrying transient failures with backoff."""
+        breaker = self._breaker(self.login_url)
+        retry = 0
+        while True:
+            if not breaker.allow_request():
+                raise MessProfisCircuitOpenError(
+                    "Portal failed repeatedly, not sending requests for now"
+                )
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire()
+            try:
+                async with self._limiter:
+                    result = await self._async_fetch_once(email, password_hash)
+            except MessProfisConnectionError as err:
+                breaker.record_failure()
+                if retry + 1 >= self._retry_policy.attempts:
+                    raise
+                delay = self._retry_policy.delay(retry)
+                _LOGGER.debug("%s, retrying in %.1f s", err, delay)
+                self.retries += 1
+                retry += 1
+                await asyncio.sleep(delay)
+                continue
+            except MessProfisApiError:
+                # The portal answered; only the request or its payload was bad.
+                breaker.record_success()
+                raise
+            except Exception:
+                breaker.record_failure()
+                raise
+            breaker.record_success()
+            return result
+
+    async def _async_fetch_once(self, email: str, password_hash: str) -> FetchResult:
+        """Send one request and decode the response."""
         payload = {
             "Mail": email,
             "PasswordHash": password_hash,
@@ -36,31 +237,90 @@ class MessProfisApiClient:
 
         headers = {
             "Accept": "application/json, text/plain, */*",
+            "Accept-Encoding": ACCEPT_ENCODING,
             "Origin": "https://mieterportal.mess-profis.de",
             "Referer": "https://mieterportal.mess-profis.de/login",
         }
 
+        self.requests += 1
+        started = time.perf_counter()
+        decode_time = 0.0
         try:
-            response = await self._session.post(
-                LOGIN_URL,
+            async with self._session.post(
+                self.login_url,
                 json=payload,
                 headers=headers,
-                timeout=30,
-            )
-            response.raise_for_status()
-            data = await response.json()
+                timeout=self._timeout,
+            ) as response:
+                response.raise_for_status()
+                content = ContentDecoder(
+                    response.headers.get(hdrs.CONTENT_ENCODING) if self._decompress else None
+                )
+                decoder = PayloadStreamDecoder()
+                # Large bodies are decoded in the executor, chunk by chunk; a body
+                # without Content-Length moves there once it turns out to be large.
+                offload = (
+                    self._executor is not None
+                    and (response.content_length or 0) >= OFFLOAD_MIN_BYTES
+                )
+                async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+                    decode_started = time.perf_counter()
+                    if not offload and self._executor is not None:
+                        offload = decoder.bytes_read >= OFFLOAD_MIN_BYTES
+                    if offload:
+                        await self._executor(_feed, decoder, content, chunk)
+                    else:
+                        _feed(decoder, content, chunk)
+                    decode_time += time.perf_counter() - decode_started
+                decode_started = time.perf_counter()
+                if offload:
+                    items = await self._executor(_finish, decoder, content)
+                    self.decodes_offloaded += 1
+                else:
+                    items = _finish(decoder, content)
+                    self.decodes_inline += 1
+                decode_time += time.perf_counter() - decode_started
+                self.bytes_received += content.wire_bytes
+                self.bytes_decoded += decoder.bytes_read
+                return FetchResult(
+                    payload=items,
+                    digest=decoder.digest,
+                    size=decoder.bytes_read,
+                    wire_size=content.wire_bytes,
+                    network_time=time.perf_counter() - started - decode_time,
+                    decode_time=decode_time,
+                )
         except ClientResponseError as err:
             if err.status in (401, 403):
                 raise MessProfisAuthError("Authentication failed") from err
+            if err.status == 429 or err.status >= 500:
+                raise MessProfisConnectionError(
+                    f"HTTP error while requesting API: {err.status}"
+                ) from err
             raise MessProfisApiError(f"HTTP error while requesting API: {err.status}") from err
         except (ClientError, TimeoutError) as err:
-            raise MessProfisApiError("Network error while requesting API") from err
+            raise MessProfisConnectionError("Network error while requesting API") from err
         except ValueError as err:
-            raise MessProfisFormatError("Response body is not valid JSON") from err
-
-        if not isinstance(data, list):
-            raise MessProfisFormatError("Unexpected API response format, expected list")
-        if not all(isinstance(item, dict) for item in data):
-            raise MessProfisFormatError("Unexpected API response format, expected list of objects")
+            raise MessProfisFormatError(str(err)) from err
 
-        return data
+    def as_diagnostics(self) -> dict[str, Any]:
+        """Return request, retry and circuit breaker state."""
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "coalesced": self.coalesced,
+            "cache_hits": self.cache_hits,
+            "bytes_received": self.bytes_received,
+            "bytes_decoded": self.bytes_decoded,
+            "decodes_inline": self.decodes_inline,
+            "decodes_offloaded": self.decodes_offloaded,
+            "rate_limit": (
+                None
+                if self._rate_limiter is None
+                else self._rate_limiter.as_diagnostics()
+            ),
+            "circuit_breakers": {
+                host: breaker.as_diagnostics()
+                for host, breaker in self._breakers.items()
+            },
+        }
@@ -9,25 +9,31 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_EMAIL
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+import homeassistant.helpers.config_validation as cv
 
-from .api import MessProfisApiClient, MessProfisApiError, MessProfisAuthError
+from .api import MessProfisApiError, MessProfisAuthError
 from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_METRICS,
     CONF_PASSWORD_HASH,
     CONF_UPDATE_INTERVAL_HOURS,
     DEFAULT_UPDATE_INTERVAL_HOURS,
     DOMAIN,
     MAX_UPDATE_INTERVAL_HOURS,
+    METRIC_LABELS,
     MIN_UPDATE_INTERVAL_HOURS,
+    SUPPORTED_METRICS,
 )
+from .hub import async_get_hub
 
 
 async def _validate_credentials(
     hass: HomeAssistant, email: str, password_hash: str
 ) -> None:
-    """Validate credentials against the endpoint."""
-    client = MessProfisApiClient(async_get_clientsession(hass))
-    await client.async_fetch_raw(email=email, password_hash=password_hash)
+    """Validate credentials and keep the payload for the first refresh."""
+    hub = async_get_hub(hass)
+    result = await hub.async_fetch_raw(email=email, password_hash=password_hash)
+    hub.async_add_seed(email, password_hash, result)
 
 
 class MessProfisConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -91,13 +97,19 @@ class MessProfisOptionsFlow(config_entries.OptionsFlow):
         self, user_input: dict[str, Any] | None = None
     ) -> config_entries.ConfigFlowResult:
         """Manage integration options."""
+        errors: dict[str, str] = {}
+        current = dict(self._config_entry.options)
+
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            if user_input.get(CONF_METRICS):
+                return self.async_create_entry(title="", data=user_input)
+            # Without any metric there would be no sensors left, only empty
+            # devices and a coordinator polling for nothing.
+            errors[CONF_METRICS] = "no_metrics"
+            current.update(user_input)
 
         current_hours = int(
-            self._config_entry.options.get(
-                CONF_UPDATE_INTERVAL_HOURS, DEFAULT_UPDATE_INTERVAL_HOURS
-            )
+            current.get(CONF_UPDATE_INTERVAL_HOURS, DEFAULT_UPDATE_INTERVAL_HOURS)
         )
         schema = vol.Schema(
             {
@@ -109,7 +121,15 @@ class MessProfisOptionsFlow(config_entries.OptionsFlow):
                     vol.Range(
                         min=MIN_UPDATE_INTERVAL_HOURS, max=MAX_UPDATE_INTERVAL_HOURS
                     ),
-                )
+                ),
+                vol.Required(
+                    CONF_ADAPTIVE_POLLING,
+                    default=bool(current.get(CONF_ADAPTIVE_POLLING, False)),
+                ): bool,
+                vol.Required(
+                    CONF_METRICS,
+                    default=list(current.get(CONF_METRICS) or SUPPORTED_METRICS),
+                ): cv.multi_select(METRIC_LABELS),
             }
         )
-        return self.async_show_form(step_id="init", data_schema=schema)
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
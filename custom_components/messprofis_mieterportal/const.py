@@ -6,8 +6,33 @@ DOMAIN = "messprofis_mieterportal"
 
 LOGIN_URL = "https://mieterportal.mess-profis.de/api/Mieter/Login"
 
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 30
+# Bounds a whole request, so a trickling response cannot hold a slot forever.
+TOTAL_TIMEOUT = 120
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 2.0
+RETRY_MAX_DELAY = 30.0
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 600.0
+
+# Successful results are shared with callers for the same account that
+# arrive within this many seconds.
+FETCH_CACHE_TTL = 30.0
+
+# Responses and payloads from this size on are decoded and parsed in an
+# executor thread instead of on the event loop.
+OFFLOAD_MIN_BYTES = 512 * 1024
+OFFLOAD_MIN_APARTMENTS = 25
+
+# A payload downloaded by the config flow seeds the new entry's first
+# refresh if it is used within this many seconds.
+SEED_MAX_AGE = 600.0
+
 CONF_PASSWORD_HASH = "password_hash"
 CONF_UPDATE_INTERVAL_HOURS = "update_interval_hours"
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_METRICS = "metrics"
 
 DEFAULT_UPDATE_INTERVAL_HOURS = 12
 MIN_UPDATE_INTERVAL_HOURS = 6
@@ -15,6 +40,14 @@ MAX_UPDATE_INTERVAL_HOURS = 48
 
 DEFAULT_UPDATE_INTERVAL = timedelta(hours=DEFAULT_UPDATE_INTERVAL_HOURS)
 
+# Adaptive polling: dense polls on days around learned publish days,
+# long back-off otherwise.
+ADAPTIVE_DENSE_INTERVAL = timedelta(hours=3)
+ADAPTIVE_MAX_INTERVAL = timedelta(hours=MAX_UPDATE_INTERVAL_HOURS)
+ADAPTIVE_WINDOW_MARGIN_DAYS = 2
+ADAPTIVE_MIN_OBSERVATIONS = 2
+ADAPTIVE_MAX_OBSERVATIONS = 12
+
 METRIC_HEATING = "heizung"
 METRIC_COLD_WATER = "kaltwasser"
 METRIC_HOT_WATER_ENERGY = "warmwasser"
@@ -26,3 +59,31 @@ SUPPORTED_METRICS: tuple[str, ...] = (
     METRIC_HOT_WATER_ENERGY,
     METRIC_HOT_WATER_VOLUME,
 )
+
+METRIC_LABELS: dict[str, str] = {
+    METRIC_HEATING: "Heizung",
+    METRIC_COLD_WATER: "Kaltwasser",
+    METRIC_HOT_WATER_ENERGY: "Warmwasser",
+    METRIC_HOT_WATER_VOLUME: "Warmwasser (m3)",
+}
+
+DATA_HUB = f"{DOMAIN}_hub"
+SIGNAL_METRICS_UPDATED = f"{DOMAIN}_metrics_updated_{{}}"
+
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10
+
+CONF_MAX_CONCURRENT_FETCHES = "max_concurrent_fetches"
+DEFAULT_MAX_CONCURRENT_FETCHES = 4
+MAX_CONCURRENT_FETCHES = 32
+CONF_MAX_REQUESTS_PER_MINUTE = "max_requests_per_minute"
+DEFAULT_MAX_REQUESTS_PER_MINUTE = 30
+MAX_REQUESTS_PER_MINUTE = 600
+# Requests that may be sent back to back before the rate cap applies.
+RATE_LIMIT_BURST = 4
+
+# Accounts due within this window are refreshed together in one batch.
+HUB_BATCH_WINDOW = timedelta(seconds=30)
+# Accounts restored from cache refresh at a stable offset within this window
+# after startup instead of all at once.
+HUB_STARTUP_SPREAD = timedelta(minutes=10)
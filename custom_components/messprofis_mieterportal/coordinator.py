@@ -4,27 +4,97 @@ from __future__ import annotations
 
 from datetime import timedelta
 import logging
+import time
+from typing import Any, NamedTuple
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .api import MessProfisApiClient, MessProfisApiError, MessProfisAuthError
+from .adaptive import PublishWindowLearner, count_publish_events
+from .api import MessProfisApiError, MessProfisAuthError
 from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_METRICS,
     CONF_PASSWORD_HASH,
     CONF_UPDATE_INTERVAL_HOURS,
     DEFAULT_UPDATE_INTERVAL_HOURS,
     DOMAIN,
+    OFFLOAD_MIN_APARTMENTS,
+    OFFLOAD_MIN_BYTES,
+    SIGNAL_METRICS_UPDATED,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    SUPPORTED_METRICS,
 )
-from .models import ApartmentReading
+from .hub import async_get_hub
+from .instrumentation import (
+    PHASE_APARTMENTS,
+    PHASE_DECODE,
+    PHASE_DISPATCH,
+    PHASE_MONTHS,
+    PHASE_NETWORK,
+    PHASE_PARSE,
+    PHASE_RENDER,
+    PHASE_RESPONSE_SIZE,
+    PHASE_TRANSFER_SIZE,
+    RefreshMetrics,
+    RollingStats,
+)
+from .models import ApartmentReading, ReadingsSnapshot
 from .parser import extract_apartment_readings
+from .render import SENSOR_METRICS, MetricState, RenderCache, derived_metric
+from .statistics import MessProfisStatisticsImporter
 
 _LOGGER = logging.getLogger(__name__)
 
+PARSE_INLINE = "event_loop"
+PARSE_EXECUTOR = "executor"
+
+
+def storage_key(entry_id: str) -> str:
+    """Return the storage key holding an entry's last good readings."""
+    return f"{DOMAIN}.{entry_id}"
+
+
+class _Processed(NamedTuple):
+    """Outcome of parsing and rendering one payload."""
+
+    snapshot: ReadingsSnapshot
+    changed: frozenset[str]
+    parse_ms: float
+    render_ms: float
 
-class MessProfisDataUpdateCoordinator(DataUpdateCoordinator[list[ApartmentReading]]):
+
+def _process_payload(
+    payload: list[dict[str, Any]],
+    previous: ReadingsSnapshot | None,
+    metrics: frozenset[str],
+    rendered: RenderCache,
+    derived: frozenset[str],
+) -> _Processed:
+    """Parse a payload and render its sensor states; safe to run in an executor."""
+    started = time.perf_counter()
+    snapshot = ReadingsSnapshot.from_readings(
+        extract_apartment_readings(payload, previous=previous, metrics=metrics),
+        previous,
+    )
+    parsed = time.perf_counter()
+    changed = rendered.update(snapshot, derived)
+    return _Processed(
+        snapshot,
+        changed,
+        (parsed - started) * 1000,
+        (time.perf_counter() - parsed) * 1000,
+    )
+
+
+class MessProfisDataUpdateCoordinator(DataUpdateCoordinator[ReadingsSnapshot]):
     """Handle periodic data refresh from MessProfis endpoint."""
 
     config_entry: ConfigEntry
@@ -33,25 +103,332 @@ class MessProfisDataUpdateCoordinator(DataUpdateCoordinator[list[ApartmentReadin
         update_hours = config_entry.options.get(
             CONF_UPDATE_INTERVAL_HOURS, DEFAULT_UPDATE_INTERVAL_HOURS
         )
-        update_interval = timedelta(hours=int(update_hours))
+        # Polling is driven by the domain hub, not by a per-entry timer.
+        self._fixed_interval = timedelta(hours=int(update_hours))
+        self._adaptive = bool(config_entry.options.get(CONF_ADAPTIVE_POLLING, False))
+        selected = config_entry.options.get(CONF_METRICS, SUPPORTED_METRICS)
+        self.selected_metrics: tuple[str, ...] = tuple(
+            metric for metric in SUPPORTED_METRICS if metric in selected
+        )
 
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=update_interval,
+            update_interval=None,
             config_entry=config_entry,
+            always_update=False,
         )
         self._email = str(config_entry.data["email"])
         self._password_hash = str(config_entry.data[CONF_PASSWORD_HASH])
-        self._client = MessProfisApiClient(async_get_clientsession(hass))
+        self._hub = async_get_hub(hass)
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, storage_key(config_entry.entry_id)
+        )
 
-    async def _async_update_data(self) -> list[ApartmentReading]:
+        self._statistics = MessProfisStatisticsImporter(hass, config_entry.entry_id)
+        self._publish_learner = PublishWindowLearner(hass, config_entry.entry_id)
+        self.publish_events = 0
+
+        self._rendered = RenderCache()
+        self._changed: frozenset[str] = frozenset()
+        self.entity_writes = 0
+        self.entity_writes_skipped = 0
+        self._payload_digest: str | None = None
+        self._metrics = frozenset(self.selected_metrics)
+        self._derived = self._async_derived_in_use(er.async_get(hass))
+        self._parsed_metrics: frozenset[str] | None = None
+        self.digest_hits = 0
+        self.digest_misses = 0
+        self.metrics = RefreshMetrics()
+        self.parse_paths = {PARSE_INLINE: RollingStats(), PARSE_EXECUTOR: RollingStats()}
+        self._last_fetch: tuple[str, float] | None = None
+
+    async def _async_update_data(self) -> ReadingsSnapshot:
         """Fetch data from API and normalize it."""
+        # A failed refresh keeps the previous data, so nothing needs rewriting.
+        self._changed = frozenset()
+        # The config flow leaves its validation payload for the first refresh.
+        result = self._hub.async_pop_seed(self._email, self._password_hash)
+        if result is None:
+            try:
+                result = await self._hub.async_fetch_raw(
+                    self._email, self._password_hash
+                )
+            except MessProfisAuthError as err:
+                raise ConfigEntryAuthFailed(
+                    "Authentication with MessProfis failed"
+                ) from err
+            except MessProfisApiError as err:
+                raise UpdateFailed(f"MessProfis update failed: {err}") from err
+
+        # Cached or seeded results were already measured when they were fetched.
+        if (fetch := (result.digest, result.network_time)) != self._last_fetch:
+            self._last_fetch = fetch
+            self.metrics.record(PHASE_NETWORK, result.network_time * 1000)
+            self.metrics.record(PHASE_RESPONSE_SIZE, result.size)
+            self.metrics.record(PHASE_TRANSFER_SIZE, result.wire_size)
+            self.metrics.record(PHASE_DECODE, result.decode_time * 1000)
+
+        if (
+            self.data is not None
+            and result.digest == self._payload_digest
+            and self._parsed_metrics == self._metrics
+        ):
+            # Identical body: keep the previous snapshot, listeners are skipped.
+            self.digest_hits += 1
+            if self._rendered.derived != self._derived:
+                # Derived sensors were enabled or disabled since the last render.
+                self._changed = await self._async_render(self.data)
+                if self._changed:
+                    self.async_update_listeners()
+            self._async_publish_metrics()
+            return self.data
+        self.digest_misses += 1
+
+        metrics = self._metrics
+        # Parsing and rendering large payloads would block the event loop.
+        path = (
+            PARSE_EXECUTOR
+            if len(result.payload) >= OFFLOAD_MIN_APARTMENTS
+            or result.size >= OFFLOAD_MIN_BYTES
+            else PARSE_INLINE
+        )
+        started = time.perf_counter()
+        args = (result.payload, self.data, metrics, self._rendered, self._derived)
+        if path == PARSE_EXECUTOR:
+            processed = await self.hass.async_add_executor_job(_process_payload, *args)
+        else:
+            processed = _process_payload(*args)
+        total_ms = (time.perf_counter() - started) * 1000
+        snapshot = processed.snapshot
+        self.metrics.record(PHASE_PARSE, processed.parse_ms)
+        self.metrics.record(PHASE_RENDER, processed.render_ms)
+        self.parse_paths[path].add(total_ms)
+        _LOGGER.debug(
+            "%s: parsed %d apartments (%d bytes) in %.1f ms and rendered them in "
+            "%.1f ms on the %s path, %.1f ms in total",
+            self.config_entry.title,
+            len(snapshot),
+            result.size,
+            processed.parse_ms,
+            processed.render_ms,
+            path,
+            total_ms,
+        )
+        self.metrics.record(PHASE_APARTMENTS, len(snapshot))
+        self.metrics.record(
+            PHASE_MONTHS,
+            sum(
+                len(series)
+                for apartment in snapshot
+                for series in apartment.series
+            ),
+        )
+        self._payload_digest = result.digest
+        self._parsed_metrics = metrics
+        if events := count_publish_events(self.data, snapshot):
+            self.publish_events += events
+            self._publish_learner.record(dt_util.utcnow())
+        await self._statistics.async_import(snapshot)
+        self._changed = processed.changed
+        if snapshot is self.data:
+            # Same readings, so listeners are skipped unless derived sensors
+            # were enabled or disabled in the meantime.
+            if self._changed:
+                self.async_update_listeners()
+        elif self._changed:
+            self._store.async_delay_save(
+                lambda: {
+                    "digest": result.digest,
+                    "metrics": sorted(metrics),
+                    "readings": [reading.as_dict() for reading in snapshot],
+                },
+                STORAGE_SAVE_DELAY,
+            )
+        return snapshot
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify listeners and measure how long entity dispatch takes."""
+        started = time.perf_counter()
+        super().async_update_listeners()
+        self.metrics.record(PHASE_DISPATCH, (time.perf_counter() - started) * 1000)
+        self._async_publish_metrics()
+
+    @callback
+    def _async_publish_metrics(self) -> None:
+        """Tell the diagnostic sensors that new measurements are available."""
+        async_dispatcher_send(
+            self.hass, SIGNAL_METRICS_UPDATED.format(self.config_entry.entry_id)
+        )
+
+    @property
+    def poll_interval(self) -> timedelta:
+        """Return the delay until this account should be polled again."""
+        if not self._adaptive:
+            return self._fixed_interval
+        return self._publish_learner.next_interval(
+            dt_util.utcnow(), self._fixed_interval
+        )
+
+    async def async_load_schedule(self) -> None:
+        """Restore the learned publish window used by adaptive polling."""
+        await self._publish_learner.async_load()
+
+    async def async_load_cached(self) -> bool:
+        """Seed data from the last good refresh; return whether a cache existed."""
+        stored = await self._store.async_load()
+        if not stored:
+            return False
         try:
-            payload = await self._client.async_fetch_raw(self._email, self._password_hash)
-            return extract_apartment_readings(payload)
-        except MessProfisAuthError as err:
-            raise ConfigEntryAuthFailed("Authentication with MessProfis failed") from err
-        except MessProfisApiError as err:
-            raise UpdateFailed(f"MessProfis update failed: {err}") from err
+            readings = [ApartmentReading.from_dict(item) for item in stored["readings"]]
+        except (KeyError, TypeError, ValueError):
+            _LOGGER.warning("Ignoring unreadable MessProfis cache for %s", self.name)
+            return False
+
+        snapshot = ReadingsSnapshot.from_readings(readings)
+        self._changed = await self._async_render(snapshot)
+        self._payload_digest = stored.get("digest")
+        self._parsed_metrics = frozenset(stored.get("metrics", SUPPORTED_METRICS))
+        self.data = snapshot
+        return True
+
+    async def _async_render(self, snapshot: ReadingsSnapshot) -> frozenset[str]:
+        """Render a snapshot, in the executor if it is large."""
+        started = time.perf_counter()
+        if len(snapshot) >= OFFLOAD_MIN_APARTMENTS:
+            path = PARSE_EXECUTOR
+            changed = await self.hass.async_add_executor_job(
+                self._rendered.update, snapshot, self._derived
+            )
+        else:
+            path = PARSE_INLINE
+            changed = self._rendered.update(snapshot, self._derived)
+        render_ms = (time.perf_counter() - started) * 1000
+        self.metrics.record(PHASE_RENDER, render_ms)
+        self.parse_paths[path].add(render_ms)
+        _LOGGER.debug(
+            "%s: rendered %d apartments in %.1f ms on the %s path",
+            self.config_entry.title,
+            len(snapshot),
+            render_ms,
+            path,
+        )
+        return changed
+
+    @callback
+    def async_track_metric_usage(self) -> CALLBACK_TYPE:
+        """Parse only metrics with an enabled sensor; return the unsubscribe.
+
+        Derived figures are only computed for metrics with an enabled derived
+        sensor. A metric that becomes used again is filled in by an early
+        refresh.
+        """
+        registry = er.async_get(self.hass)
+        self._metrics = self._async_metrics_in_use(registry)
+        self._derived = self._async_derived_in_use(registry)
+
+        @callback
+        def _async_registry_updated(
+            event: Event[er.EventEntityRegistryUpdatedData],
+        ) -> None:
+            if event.data["action"] != "update" or "disabled_by" not in event.data.get(
+                "changes", {}
+            ):
+                return
+            entity = registry.async_get(event.data["entity_id"])
+            if entity is None or entity.config_entry_id != self.config_entry.entry_id:
+                return
+            metrics = self._async_metrics_in_use(registry)
+            derived = self._async_derived_in_use(registry)
+            added = (metrics - self._metrics) | (derived - self._derived)
+            self._metrics = metrics
+            self._derived = derived
+            if added:
+                _LOGGER.debug("%s: %s needed again", self.name, ", ".join(sorted(added)))
+                self.config_entry.async_create_background_task(
+                    self.hass,
+                    self.async_request_refresh(),
+                    name=f"{DOMAIN}_metrics_refresh",
+                )
+
+        return self.hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED, _async_registry_updated
+        )
+
+    @callback
+    def _async_metrics_in_use(self, registry: er.EntityRegistry) -> frozenset[str]:
+        """Return the selected metrics that have at least one enabled sensor."""
+        selected = frozenset(self.selected_metrics)
+        disabled = {
+            entity.unique_id
+            for entity in er.async_entries_for_config_entry(
+                registry, self.config_entry.entry_id
+            )
+            if entity.disabled_by is not None
+        }
+        if not disabled:
+            return selected
+        in_use: set[str] = set()
+        apartments = 0
+        for unique_ids in self._rendered.unique_ids():
+            apartments += 1
+            for unique_id, metric in zip(unique_ids, SENSOR_METRICS):
+                if metric in selected and unique_id not in disabled:
+                    in_use.add(metric)
+            if len(in_use) == len(selected):
+                break
+        # Without known apartments there is nothing to judge by yet.
+        return frozenset(in_use) if apartments else selected
+
+    @callback
+    def _async_derived_in_use(self, registry: er.EntityRegistry) -> frozenset[str]:
+        """Return the selected metrics that have at least one enabled derived sensor."""
+        return frozenset(
+            metric
+            for entity in er.async_entries_for_config_entry(
+                registry, self.config_entry.entry_id
+            )
+            if entity.disabled_by is None
+            and (metric := derived_metric(entity.unique_id)) in self.selected_metrics
+        )
+
+    def metric_changed(self, unique_id: str) -> bool:
+        """Return whether the last refresh changed the state of this sensor."""
+        return unique_id in self._changed
+
+    def rendered_state(self, unique_id: str) -> MetricState:
+        """Return the state of a sensor as rendered after the last refresh."""
+        return self._rendered.get(unique_id)
+
+    def record_entity_update(self, written: bool) -> None:
+        """Count entity state writes done or skipped after a refresh."""
+        if written:
+            self.entity_writes += 1
+        else:
+            self.entity_writes_skipped += 1
+
+    def as_diagnostics(self) -> dict[str, Any]:
+        """Return coordinator state for the diagnostics download."""
+        return {
+            "apartments": 0 if self.data is None else len(self.data),
+            "last_update_success": self.last_update_success,
+            "changed_metrics": len(self._changed),
+            "rendered_states": self._rendered.rendered,
+            "aggregated_months": self._rendered.consumption.months_processed,
+            "aggregated_metrics": sorted(self._derived),
+            "entity_writes": self.entity_writes,
+            "entity_writes_skipped": self.entity_writes_skipped,
+            "payload_digest_hits": self.digest_hits,
+            "payload_digest_misses": self.digest_misses,
+            "parsed_metrics": sorted(self._metrics),
+            "parse_paths": {
+                path: stats.as_dict() for path, stats in self.parse_paths.items()
+            },
+            "statistics": self._statistics.as_diagnostics(),
+            "adaptive_polling": self._adaptive,
+            "poll_interval": str(self.poll_interval),
+            "publish_events": self.publish_events,
+            "schedule": self._publish_learner.as_diagnostics(),
+        }
@@ -0,0 +1,248 @@
+"""Incremental decoder for the MessProfis API response payload."""
+
+from __future__ import annotations
+
+import codecs
+from hashlib import sha256
+import json
+import re
+from typing import Any
+import zlib
+
+from .const import SUPPORTED_METRICS
+
+try:
+    import brotli as _brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    try:
+        import brotlicffi as _brotli
+    except ImportError:
+        _brotli = None
+
+READ_CHUNK_SIZE = 64 * 1024
+
+ACCEPT_ENCODING = "gzip, deflate, br" if _brotli is not None else "gzip, deflate"
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_APARTMENT_FIELDS = ("title1", "title2", "status")
+_SECTION_FIELDS = ("monate", "jahreswert")
+_MONTH_FIELDS = ("datum", "wert", "enthaeltSchaetzung")
+
+
+def _prune_section(aktuell: Any) -> Any:
+    """Keep only the fields of werte.<metric>.aktuell the parser reads."""
+    if not isinstance(aktuell, dict):
+        return aktuell
+    pruned = {key: aktuell[key] for key in _SECTION_FIELDS if key in aktuell}
+    monate = pruned.get("monate")
+    if isinstance(monate, list):
+        pruned["monate"] = [
+            {key: month[key] for key in _MONTH_FIELDS if key in month}
+            if isinstance(month, dict)
+            else month
+            for month in monate
+        ]
+    return pruned
+
+
+def prune_apartment(item: dict[str, Any]) -> dict[str, Any]:
+    """Drop every part of an apartment object the parser does not use."""
+    pruned = {key: item[key] for key in _APARTMENT_FIELDS if key in item}
+    if "werte" not in item:
+        return pruned
+
+    werte = item["werte"]
+    if not isinstance(werte, dict):
+        pruned["werte"] = werte
+        return pruned
+
+    pruned_werte: dict[str, Any] = {}
+    for metric in SUPPORTED_METRICS:
+        if metric not in werte:
+            continue
+        metric_obj = werte[metric]
+        if isinstance(metric_obj, dict) and "aktuell" in metric_obj:
+            metric_obj = {"aktuell": _prune_section(metric_obj["aktuell"])}
+        elif isinstance(metric_obj, dict):
+            metric_obj = {}
+        pruned_werte[metric] = metric_obj
+    pruned["werte"] = pruned_werte
+    return pruned
+
+
+def _is_zlib_header(data: bytes) -> bool:
+    """Return whether a deflate body starts with a zlib header (RFC 1950)."""
+    cmf, flg = data[0], data[1]
+    return cmf & 0x0F == 8 and cmf >> 4 <= 7 and (cmf << 8 | flg) % 31 == 0
+
+
+class ContentDecoder:
+    """Undo the Content-Encoding of a response body chunk by chunk.
+
+    Counts the bytes received on the wire, so the transfer size stays visible
+    after decompression.
+    """
+
+    def __init__(self, encoding: str | None) -> None:
+        self.encoding = (encoding or "identity").strip().lower() or "identity"
+        self.wire_bytes = 0
+        # The first bytes of a deflate body, until its format is known.
+        self._header: bytes | None = None
+        if self.encoding == "identity":
+            self._decompressor: Any = None
+        elif self.encoding in ("gzip", "x-gzip"):
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self.encoding == "deflate":
+            self._decompressor = None
+            self._header = b""
+        elif self.encoding == "br" and _brotli is not None:
+            self._decompressor = _brotli.Decompressor()
+        else:
+            raise ValueError(f"Unsupported content encoding: {encoding}")
+
+    def decompress(self, chunk: bytes) -> bytes:
+        """Return the decoded bytes of the next raw chunk."""
+        self.wire_bytes += len(chunk)
+        if self._header is not None:
+            # Some servers send "deflate" without the zlib header; the first
+            # two bytes tell the formats apart, however the body is chunked.
+            chunk = self._header + chunk
+            if len(chunk) < 2:
+                self._header = chunk
+                return b""
+            self._header = None
+            self._decompressor = zlib.decompressobj(
+                zlib.MAX_WBITS if _is_zlib_header(chunk) else -zlib.MAX_WBITS
+            )
+        if self._decompressor is None:
+            return chunk
+        try:
+            if self.encoding == "br":
+                process = getattr(self._decompressor, "process", None)
+                return (process or self._decompressor.decompress)(chunk)
+            return self._decompressor.decompress(chunk)
+        except zlib.error as err:
+            raise ValueError(f"Invalid {self.encoding} response body") from err
+        except Exception as err:
+            if _brotli is not None and isinstance(err, _brotli.error):
+                raise ValueError("Invalid br response body") from err
+            raise
+
+    def flush(self) -> bytes:
+        """Return any buffered output and check the stream was complete."""
+        if self._header is not None:
+            raise ValueError(f"Truncated {self.encoding} response body")
+        if self._decompressor is None:
+            return b""
+        if self.encoding == "br":
+            if not self._decompressor.is_finished():
+                raise ValueError("Truncated br response body")
+            return b""
+        tail = self._decompressor.flush()
+        if not self._decompressor.eof:
+            raise ValueError(f"Truncated {self.encoding} response body")
+        return tail
+
+
+class PayloadStreamDecoder:
+    """Decode the top-level payload list chunk by chunk.
+
+    Only one apartment object is held in decoded form at a time; it is pruned
+    to the fields the parser needs before the next one is decoded. A SHA-256
+    digest of the raw bytes is computed on the way.
+    """
+
+    def __init__(self) -> None:
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._started = False
+        self._finished = False
+        self._expect_item = True
+        self._retry_at = 0
+        self._hash = sha256()
+        self.items: list[dict[str, Any]] = []
+        self.bytes_read = 0
+
+    @property
+    def digest(self) -> str:
+        """Return the hex digest of all raw bytes fed so far."""
+        return self._hash.hexdigest()
+
+    def feed(self, chunk: bytes) -> None:
+        """Consume the next chunk of the raw response body."""
+        self.bytes_read += len(chunk)
+        self._hash.update(chunk)
+        self._buffer += self._text.decode(chunk)
+        self._drain(final=False)
+
+    def finish(self) -> list[dict[str, Any]]:
+        """Flush the remaining input and return the pruned apartment list."""
+        self._buffer += self._text.decode(b"", final=True)
+        self._drain(final=True)
+        if not self._finished:
+            raise ValueError("Response body is not valid JSON")
+        return self.items
+
+    def _drain(self, final: bool) -> None:
+        """Decode every complete element currently in the buffer."""
+        buffer = self._buffer
+        pos = 0
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+            if self._finished:
+                raise ValueError("Response body is not valid JSON")
+            if not self._started:
+                if buffer[pos] != "[":
+                    raise ValueError("Unexpected API response format, expected list")
+                self._started = True
+                pos += 1
+                continue
+            if not self._expect_item:
+                if buffer[pos] == ",":
+                    self._expect_item = True
+                elif buffer[pos] == "]":
+                    self._finished = True
+                else:
+                    raise ValueError("Response body is not valid JSON")
+                pos += 1
+                continue
+            if buffer[pos] == "]" and not self.items:
+                self._finished = True
+                pos += 1
+                continue
+            # Retry an incomplete element only once the buffer has doubled,
+            # which keeps re-decoding of large elements amortized linear.
+            if not final and len(buffer) - pos < self._retry_at:
+                break
+            try:
+                item, end = self._json.raw_decode(buffer, pos)
+            except json.JSONDecodeError as err:
+                if final:
+                    raise ValueError("Response body is not valid JSON") from err
+                self._retry_at = 2 * (len(buffer) - pos)
+                break
+            if not isinstance(item, dict):
+                raise ValueError(
+                    "Unexpected API response format, expected list of objects"
+                )
+            self.items.append(prune_apartment(item))
+            self._retry_at = 0
+            self._expect_item = False
+            pos = end
+        self._buffer = buffer[pos:]
+
+
+def decode_payload(body: bytes, chunk_size: int = READ_CHUNK_SIZE) -> list[dict[str, Any]]:
+    """Decode a complete response body through the streaming decoder.
+
+    The integration feeds chunks as they arrive; this is the entry point of
+    scripts/bench-decoder.py.
+    """
+    decoder = PayloadStreamDecoder()
+    view = memoryview(body)
+    for start in range(0, len(body), chunk_size):
+        decoder.feed(bytes(view[start : start + chunk_size]))
+    return decoder.finish()
@@ -0,0 +1,32 @@
+"""Diagnostics support for MessProfis Mieterportal."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_PASSWORD_HASH, DOMAIN
+from .coordinator import MessProfisDataUpdateCoordinator
+from .hub import async_get_hub
+
+TO_REDACT = {CONF_EMAIL, CONF_PASSWORD_HASH}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: MessProfisDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": coordinator.as_diagnostics(),
+        "refresh_metrics": coordinator.metrics.as_dict(),
+        "hub": async_get_hub(hass).as_diagnostics(),
+    }
@@ -0,0 +1,241 @@
+"""Domain-wide scheduler that refreshes all MessProfis accounts in batches."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+import logging
+import math
+import time
+from typing import TYPE_CHECKING, Any
+import zlib
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .api import FetchResult, MessProfisApiClient
+from .const import (
+    DATA_HUB,
+    DEFAULT_MAX_CONCURRENT_FETCHES,
+    DEFAULT_MAX_REQUESTS_PER_MINUTE,
+    HUB_BATCH_WINDOW,
+    HUB_STARTUP_SPREAD,
+    RATE_LIMIT_BURST,
+    SEED_MAX_AGE,
+)
+from .resilience import RateLimiter
+
+if TYPE_CHECKING:
+    from .coordinator import MessProfisDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def entry_phase(entry_id: str) -> float:
+    """Return a stable fraction in [0, 1) that places an entry's polls.
+
+    Derived from the entry id, so an account keeps its slot across restarts
+    and the slots of many accounts are spread evenly.
+    """
+    return zlib.crc32(entry_id.encode("utf-8")) / 2**32
+
+
+def next_poll_slot(entry_id: str, earliest: datetime, interval: timedelta) -> datetime:
+    """Return the entry's first poll slot at or after `earliest`.
+
+    Slots repeat every `interval`, shifted by the entry's phase.
+    """
+    period = interval.total_seconds()
+    offset = entry_phase(entry_id) * period
+    slot = math.ceil((earliest.timestamp() - offset) / period) * period + offset
+    return dt_util.utc_from_timestamp(slot)
+
+
+class MessProfisHub:
+    """Own all accounts of the domain and poll them on one shared timer."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENT_FETCHES,
+        requests_per_minute: int = DEFAULT_MAX_REQUESTS_PER_MINUTE,
+    ) -> None:
+        self.hass = hass
+        self.client = MessProfisApiClient(
+            # Own session so the body reaches the client still compressed.
+            async_create_clientsession(hass, auto_decompress=False),
+            max_concurrency=max_concurrency,
+            rate_limiter=RateLimiter(requests_per_minute, burst=RATE_LIMIT_BURST),
+            executor=hass.async_add_executor_job,
+        )
+        self._max_concurrency = max_concurrency
+        self._requests_per_minute = requests_per_minute
+        self._coordinators: dict[str, MessProfisDataUpdateCoordinator] = {}
+        self._next_due: dict[str, datetime] = {}
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._seeds: dict[tuple[str, str], tuple[float, FetchResult]] = {}
+        self.batches = 0
+        self.seeds_used = 0
+
+    @callback
+    def async_configure(
+        self,
+        max_concurrency: int,
+        requests_per_minute: int = DEFAULT_MAX_REQUESTS_PER_MINUTE,
+    ) -> None:
+        """Apply domain-wide settings from configuration.yaml."""
+        if max_concurrency != self._max_concurrency:
+            self._max_concurrency = max_concurrency
+            self.client.set_max_concurrency(max_concurrency)
+        if requests_per_minute != self._requests_per_minute:
+            self._requests_per_minute = requests_per_minute
+            self.client.set_rate_limiter(
+                RateLimiter(requests_per_minute, burst=RATE_LIMIT_BURST)
+            )
+
+    async def async_fetch_raw(self, email: str, password_hash: str) -> FetchResult:
+        """Fetch one account through the shared, concurrency-limited client."""
+        return await self.client.async_fetch_raw(email, password_hash)
+
+    @callback
+    def async_add_seed(
+        self, email: str, password_hash: str, result: FetchResult
+    ) -> None:
+        """Keep a freshly validated payload for the account's first refresh."""
+        now = time.monotonic()
+        self._seeds = {
+            key: seed for key, seed in self._seeds.items() if now - seed[0] < SEED_MAX_AGE
+        }
+        self._seeds[(email, password_hash)] = (now, result)
+
+    @callback
+    def async_pop_seed(self, email: str, password_hash: str) -> FetchResult | None:
+        """Return and forget the seed payload of an account, if still fresh."""
+        seed = self._seeds.pop((email, password_hash), None)
+        if seed is None or time.monotonic() - seed[0] >= SEED_MAX_AGE:
+            return None
+        self.seeds_used += 1
+        return seed[1]
+
+    @callback
+    def async_register(
+        self, coordinator: MessProfisDataUpdateCoordinator, refresh_soon: bool = False
+    ) -> CALLBACK_TYPE:
+        """Schedule an account's coordinator; returns a callback to remove it.
+
+        With `refresh_soon` the first refresh happens within the startup
+        spread, otherwise in the account's next poll slot.
+        """
+        entry_id = coordinator.config_entry.entry_id
+        now = dt_util.utcnow()
+        self._coordinators[entry_id] = coordinator
+        if refresh_soon:
+            self._next_due[entry_id] = now + HUB_STARTUP_SPREAD * entry_phase(entry_id)
+        else:
+            self._next_due[entry_id] = self._next_slot(coordinator, now)
+        self._async_schedule()
+
+        @callback
+        def _unregister() -> None:
+            self._coordinators.pop(entry_id, None)
+            self._next_due.pop(entry_id, None)
+            self._async_schedule()
+
+        return _unregister
+
+    @staticmethod
+    def _next_slot(
+        coordinator: MessProfisDataUpdateCoordinator, refreshed: datetime
+    ) -> datetime:
+        """Return the poll slot following a refresh of the account.
+
+        The first slot at least half an interval after the refresh; once an
+        account is in its slot, polls are exactly one interval apart.
+        """
+        interval = coordinator.poll_interval
+        return next_poll_slot(
+            coordinator.config_entry.entry_id, refreshed + interval / 2, interval
+        )
+
+    @callback
+    def _async_schedule(self) -> None:
+        """(Re)arm the single timer for the earliest due account."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if not self._next_due:
+            return
+        self._unsub_timer = async_track_point_in_utc_time(
+            self.hass, self._async_handle_timer, min(self._next_due.values())
+        )
+
+    @callback
+    def _async_handle_timer(self, now: datetime) -> None:
+        """Start a batch for every account that is (nearly) due."""
+        self._unsub_timer = None
+        horizon = now + HUB_BATCH_WINDOW
+        due = [
+            self._coordinators[entry_id]
+            for entry_id, next_due in self._next_due.items()
+            if next_due <= horizon
+        ]
+        for coordinator in due:
+            entry_id = coordinator.config_entry.entry_id
+            self._next_due[entry_id] = self._next_slot(coordinator, now)
+        self._async_schedule()
+
+        if due:
+            self.hass.async_create_background_task(
+                self._async_run_batch(due), name="messprofis_hub_batch"
+            )
+
+    async def _async_run_batch(
+        self, coordinators: list[MessProfisDataUpdateCoordinator]
+    ) -> None:
+        """Refresh the given accounts; the client's rate cap paces the requests."""
+        self.batches += 1
+        _LOGGER.debug(
+            "Refreshing %d of %d MessProfis accounts (max %d concurrent)",
+            len(coordinators),
+            len(self._coordinators),
+            self._max_concurrency,
+        )
+        await asyncio.gather(
+            *(coordinator.async_refresh() for coordinator in coordinators)
+        )
+
+        # A refresh can change an account's interval (adaptive polling).
+        now = dt_util.utcnow()
+        for coordinator in coordinators:
+            entry_id = coordinator.config_entry.entry_id
+            if entry_id in self._next_due:
+                self._next_due[entry_id] = self._next_slot(coordinator, now)
+        self._async_schedule()
+
+    def as_diagnostics(self) -> dict[str, Any]:
+        """Return hub state for the diagnostics download."""
+        return {
+            "accounts": len(self._coordinators),
+            "max_concurrency": self._max_concurrency,
+            "max_requests_per_minute": self._requests_per_minute,
+            "next_due": {
+                entry_id: next_due.isoformat()
+                for entry_id, next_due in sorted(
+                    self._next_due.items(), key=lambda item: item[1]
+                )
+            },
+            "batches": self.batches,
+            "seeds_used": self.seeds_used,
+            "client": self.client.as_diagnostics(),
+        }
+
+
+@callback
+def async_get_hub(hass: HomeAssistant) -> MessProfisHub:
+    """Return the domain hub, creating it on first use."""
+    hub: MessProfisHub | None = hass.data.get(DATA_HUB)
+    if hub is None:
+        hub = hass.data[DATA_HUB] = MessProfisHub(hass)
+    return hub
@@ -0,0 +1,82 @@
+"""Rolling per-phase measurements of coordinator refreshes."""
+
+from __future__ import annotations
+
+from collections import deque
+import math
+from typing import Any
+
+PHASE_NETWORK = "network_ms"
+PHASE_RESPONSE_SIZE = "response_bytes"
+PHASE_TRANSFER_SIZE = "transfer_bytes"
+PHASE_DECODE = "decode_ms"
+PHASE_PARSE = "parse_ms"
+PHASE_RENDER = "render_ms"
+PHASE_APARTMENTS = "apartments"
+PHASE_MONTHS = "months"
+PHASE_DISPATCH = "dispatch_ms"
+
+PHASES: tuple[str, ...] = (
+    PHASE_NETWORK,
+    PHASE_RESPONSE_SIZE,
+    PHASE_TRANSFER_SIZE,
+    PHASE_DECODE,
+    PHASE_PARSE,
+    PHASE_RENDER,
+    PHASE_APARTMENTS,
+    PHASE_MONTHS,
+    PHASE_DISPATCH,
+)
+
+DEFAULT_WINDOW = 100
+
+
+class RollingStats:
+    """Keep the most recent samples of one measurement."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        """Record a sample."""
+        self._samples.append(value)
+        self.count += 1
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the nearest-rank percentile of the retained samples."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(1, math.ceil(percent / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return count, last value and percentiles."""
+        return {
+            "count": self.count,
+            "last": self._samples[-1] if self._samples else None,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": max(self._samples) if self._samples else None,
+        }
+
+
+class RefreshMetrics:
+    """Rolling statistics for every refresh phase of one account."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self._stats = {phase: RollingStats(window) for phase in PHASES}
+
+    def record(self, phase: str, value: float) -> None:
+        """Record one sample of a phase."""
+        self._stats[phase].add(value)
+
+    def get(self, phase: str) -> RollingStats:
+        """Return the statistics of a phase."""
+        return self._stats[phase]
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Return all phases for diagnostics."""
+        return {phase: stats.as_dict() for phase, stats in self._stats.items()}
@@ -2,25 +2,227 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from array import array
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import asdict, dataclass
+from operator import is_
+import sys
+from types import MappingProxyType
+from typing import Any
+
+from .const import SUPPORTED_METRICS
+
+
+METRIC_SLOTS: dict[str, int] = {
+    metric: slot for slot, metric in enumerate(SUPPORTED_METRICS)
+}
 
 
 @dataclass(slots=True)
 class MonthlyValue:
-    """A normalized monthly value entry."""
+    """A normalized monthly value entry.
+
+    Instances are shared between a reading's latest value and its history,
+    and across refreshes, so they must not be modified.
+    """
 
     datum: str
     wert: float
     estimated: bool
 
 
+class MonthlySeries(Sequence[MonthlyValue]):
+    """Monthly values of one metric, oldest first, stored column-wise.
+
+    Dates are kept as a tuple of interned strings, values in a float array
+    and estimate flags as a bitmask; MonthlyValue objects are only created
+    when entries are accessed.
+    """
+
+    __slots__ = ("dates", "values", "estimated")
+
+    def __init__(self, dates: tuple[str, ...], values: array, estimated: int) -> None:
+        self.dates = dates
+        self.values = values
+        self.estimated = estimated
+
+    @classmethod
+    def from_values(cls, months: Iterable[MonthlyValue]) -> MonthlySeries:
+        """Build a series from monthly values that are already sorted."""
+        dates: list[str] = []
+        values = array("d")
+        estimated = 0
+        for index, month in enumerate(months):
+            dates.append(sys.intern(month.datum))
+            values.append(month.wert)
+            if month.estimated:
+                estimated |= 1 << index
+        if not dates:
+            return NO_MONTHS
+        return cls(tuple(dates), values, estimated)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            return [self[position] for position in range(len(self))[index]]
+        if index < 0:
+            index += len(self.dates)
+        return MonthlyValue(
+            datum=self.dates[index],
+            wert=self.values[index],
+            estimated=bool(self.estimated >> index & 1),
+        )
+
+    def __iter__(self) -> Iterator[MonthlyValue]:
+        for index, (datum, wert) in enumerate(zip(self.dates, self.values)):
+            yield MonthlyValue(datum, wert, bool(self.estimated >> index & 1))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MonthlySeries):
+            return NotImplemented
+        return (
+            self.estimated == other.estimated
+            and self.dates == other.dates
+            and self.values == other.values
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"MonthlySeries({list(self)!r})"
+
+
+NO_MONTHS = MonthlySeries((), array("d"), 0)
+EMPTY_SERIES: tuple[MonthlySeries, ...] = (NO_MONTHS,) * len(SUPPORTED_METRICS)
+
+
 @dataclass(slots=True)
 class ApartmentReading:
-    """Normalized readings for one apartment/unit."""
+    """Normalized readings for one apartment/unit.
+
+    Per-metric data is held in tuples with one slot per entry of
+    SUPPORTED_METRICS, see METRIC_SLOTS.
+    """
 
     apartment_key: str
     title1: str
     title2: str
     status: str | None
-    values: dict[str, MonthlyValue | None]
-    jahreswerte: dict[str, float | None]
+    latest: tuple[MonthlyValue | None, ...]
+    annual: tuple[float | None, ...]
+    series: tuple[MonthlySeries, ...] = EMPTY_SERIES
+
+    @property
+    def display_name(self) -> str:
+        """Return the joined titles, or the apartment key if both are empty."""
+        return " ".join(
+            part.strip() for part in (self.title1, self.title2) if part and part.strip()
+        ) or self.apartment_key
+
+    def value(self, metric: str) -> MonthlyValue | None:
+        """Return the latest monthly value of a metric."""
+        slot = METRIC_SLOTS.get(metric)
+        return None if slot is None else self.latest[slot]
+
+    def jahreswert(self, metric: str) -> float | None:
+        """Return the annual value of a metric."""
+        slot = METRIC_SLOTS.get(metric)
+        return None if slot is None else self.annual[slot]
+
+    def history(self, metric: str) -> MonthlySeries:
+        """Return all monthly values of a metric, oldest first."""
+        slot = METRIC_SLOTS.get(metric)
+        return NO_MONTHS if slot is None else self.series[slot]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable representation."""
+        return {
+            "apartment_key": self.apartment_key,
+            "title1": self.title1,
+            "title2": self.title2,
+            "status": self.status,
+            "values": {
+                metric: None if value is None else asdict(value)
+                for metric, value in zip(SUPPORTED_METRICS, self.latest)
+            },
+            "jahreswerte": dict(zip(SUPPORTED_METRICS, self.annual)),
+            "history": {
+                metric: [asdict(value) for value in series]
+                for metric, series in zip(SUPPORTED_METRICS, self.series)
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ApartmentReading:
+        """Restore a reading stored with as_dict()."""
+        values = data["values"]
+        jahreswerte = data["jahreswerte"]
+        history = data.get("history", {})
+        latest: list[MonthlyValue | None] = []
+        for metric in SUPPORTED_METRICS:
+            value = values.get(metric)
+            latest.append(
+                None
+                if value is None
+                else MonthlyValue(sys.intern(value["datum"]), value["wert"], value["estimated"])
+            )
+        series = tuple(
+            MonthlySeries.from_values(MonthlyValue(**value) for value in history.get(metric, ()))
+            for metric in SUPPORTED_METRICS
+        )
+        return cls(
+            apartment_key=data["apartment_key"],
+            title1=sys.intern(data["title1"]),
+            title2=sys.intern(data["title2"]),
+            status=None if data["status"] is None else sys.intern(data["status"]),
+            latest=tuple(latest),
+            annual=tuple(jahreswerte.get(metric) for metric in SUPPORTED_METRICS),
+            series=series,
+        )
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class ReadingsSnapshot:
+    """Immutable result of one refresh, indexed by apartment key.
+
+    Snapshots compare by identity, so a refresh that reuses the previous
+    snapshot is recognized as unchanged without a deep comparison.
+    """
+
+    apartments: tuple[ApartmentReading, ...]
+    by_key: Mapping[str, ApartmentReading]
+
+    @classmethod
+    def from_readings(
+        cls,
+        readings: Iterable[ApartmentReading],
+        previous: ReadingsSnapshot | None = None,
+    ) -> ReadingsSnapshot:
+        """Build a snapshot, keeping the first reading for duplicate keys.
+
+        Returns `previous` itself if it holds the identical readings in the
+        same order, so an unchanged refresh does not notify listeners.
+        """
+        apartments = tuple(readings)
+        if (
+            previous is not None
+            and len(apartments) == len(previous.apartments)
+            and all(map(is_, apartments, previous.apartments))
+        ):
+            return previous
+        index: dict[str, ApartmentReading] = {}
+        for apartment in apartments:
+            index.setdefault(apartment.apartment_key, apartment)
+        return cls(apartments=apartments, by_key=MappingProxyType(index))
+
+    def get(self, apartment_key: str) -> ApartmentReading | None:
+        """Return the reading for an apartment key, if present."""
+        return self.by_key.get(apartment_key)
+
+    def __iter__(self) -> Iterator[ApartmentReading]:
+        return iter(self.apartments)
+
+    def __len__(self) -> int:
+        return len(self.apartments)
@@ -2,12 +2,28 @@
 
 from __future__ import annotations
 
+from array import array
+from collections.abc import Collection
 from datetime import datetime
+from functools import lru_cache
 from hashlib import sha1
-from typing import Any
+from operator import is_, itemgetter
+import sys
+from typing import Any, TypeVar
 
 from .const import SUPPORTED_METRICS
-from .models import ApartmentReading, MonthlyValue
+from .models import (
+    NO_MONTHS,
+    ApartmentReading,
+    MonthlySeries,
+    MonthlyValue,
+    ReadingsSnapshot,
+)
+
+_T = TypeVar("_T")
+
+# Stands in for the section of a metric that is not parsed. Never modified.
+_SKIPPED_SECTION: dict[str, Any] = {}
 
 
 def parse_iso_date(date_str: str) -> datetime:
@@ -23,83 +39,227 @@ def _safe_float(value: Any) -> float | None:
         return None
 
 
+def month_key(datum: str) -> str:
+    """Normalize an ISO date string so that string order equals date order."""
+    if len(datum) == 10:
+        return f"{datum}T00:00:00"
+    if len(datum) > 10 and datum[10] == " ":
+        return f"{datum[:10]}T{datum[11:]}"
+    return datum
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(datum: str) -> tuple[str, str] | None:
+    """Return the month key and interned form of a date, None if it does not parse.
+
+    Memoized, most months repeat across apartments and refreshes.
+    """
+    try:
+        parse_iso_date(datum)
+    except ValueError:
+        return None
+    return month_key(datum), sys.intern(datum)
+
+
 def get_latest_month_value(section: dict[str, Any]) -> MonthlyValue | None:
-    """Return the newest valid value in section['monate']."""
+    """Return the newest valid value in section['monate'].
+
+    Entries are compared by their normalized date string in a single pass.
+    An entry is only validated when it would become the newest so far;
+    invalid entries are skipped and the newest valid one wins. Of several
+    valid entries with the same date, the first one wins.
+    """
     monate = section.get("monate", [])
     if not isinstance(monate, list) or not monate:
         return None
 
-    valid_entries: list[tuple[datetime, str, float, bool]] = []
+    best_key: str | None = None
+    best_month: dict[str, Any] = {}
+    best_datum = ""
+    best_wert = 0.0
     for month in monate:
         if not isinstance(month, dict):
             continue
         try:
             datum = str(month["datum"])
-            parsed_date = parse_iso_date(datum)
+        except KeyError:
+            continue
+        key = month_key(datum)
+        if best_key is not None and key <= best_key:
+            continue
+        if _parse_date(datum) is None:
+            continue
+        try:
             wert = float(month["wert"])
         except (KeyError, TypeError, ValueError):
             continue
+        best_key, best_month, best_datum, best_wert = key, month, datum, wert
 
-        estimated = bool(month.get("enthaeltSchaetzung", False))
-        valid_entries.append((parsed_date, datum, wert, estimated))
-
-    if not valid_entries:
+    if best_key is None:
         return None
+    estimated = bool(best_month.get("enthaeltSchaetzung", False))
+    return MonthlyValue(datum=sys.intern(best_datum), wert=best_wert, estimated=estimated)
 
-    valid_entries.sort(key=lambda item: item[0], reverse=True)
-    _, datum, wert, estimated = valid_entries[0]
-    return MonthlyValue(datum=datum, wert=wert, estimated=estimated)
 
+def get_monthly_series(section: dict[str, Any]) -> MonthlySeries:
+    """Return all valid entries of section['monate'], oldest first.
 
-def _build_apartment_key(title1: str, title2: str, fallback_index: int) -> str:
-    """Generate a stable key from titles and fallback index."""
+    An entry is valid under the same rule as in get_latest_month_value: its
+    date parses and its value is numeric. Of several entries with the same
+    date only the first valid one is kept, so the newest entry of the series
+    is always the latest value.
+    """
+    monate = section.get("monate", [])
+    if not isinstance(monate, list) or not monate:
+        return NO_MONTHS
+
+    by_key: dict[str, tuple[str, float, bool]] = {}
+    for month in monate:
+        if not isinstance(month, dict):
+            continue
+        try:
+            datum = str(month["datum"])
+            wert = float(month["wert"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if (parsed := _parse_date(datum)) is None:
+            continue
+        key, datum = parsed
+        if key not in by_key:
+            by_key[key] = (datum, wert, bool(month.get("enthaeltSchaetzung", False)))
+
+    if not by_key:
+        return NO_MONTHS
+    entries = [by_key[key] for key in sorted(by_key)]
+    flags = 0
+    for index, entry in enumerate(entries):
+        if entry[2]:
+            flags |= 1 << index
+    return MonthlySeries(
+        _shared_dates(tuple([entry[0] for entry in entries])),
+        array("d", [entry[1] for entry in entries]),
+        flags,
+    )
+
+
+def _newest(series: MonthlySeries) -> MonthlyValue | None:
+    """Return the newest entry of a series, None if it is empty."""
+    return series[-1] if series else None
+
+
+@lru_cache(maxsize=256)
+def _shared_dates(dates: tuple[str, ...]) -> tuple[str, ...]:
+    """Return one shared tuple for equal date columns; most series share months."""
+    return dates
+
+
+@lru_cache(maxsize=65536)
+def _title_key(title1: str, title2: str) -> str | None:
+    """Hash the titles of an apartment; memoized, titles rarely change."""
     base = f"{title1}|{title2}".strip("|")
     if not base:
-        return f"wohnung_{fallback_index}"
+        return None
     return sha1(base.encode("utf-8"), usedforsecurity=False).hexdigest()[:12]
 
 
-def extract_apartment_readings(payload: list[dict[str, Any]]) -> list[ApartmentReading]:
-    """Normalize API payload to apartment readings."""
+def _build_apartment_key(title1: str, title2: str, fallback_index: int) -> str:
+    """Generate a stable key from titles and fallback index."""
+    return _title_key(title1, title2) or f"wohnung_{fallback_index}"
+
+
+def _reuse(previous: _T, current: _T) -> _T:
+    """Return the previous object if it equals the current one."""
+    return previous if previous == current else current
+
+
+def _aktuell_section(werte: dict[str, Any], metric: str) -> dict[str, Any]:
+    """Return werte.<metric>.aktuell, or an empty section if it is malformed."""
+    metric_obj = werte.get(metric, {})
+    if not isinstance(metric_obj, dict):
+        return {}
+    aktuell = metric_obj.get("aktuell", {})
+    if not isinstance(aktuell, dict):
+        return {}
+    return aktuell
+
+
+def _apartment_sections(
+    item: dict[str, Any], skipped: list[bool]
+) -> list[dict[str, Any]]:
+    """Return the aktuell section of every metric, ordered as SUPPORTED_METRICS."""
+    werte = item.get("werte", {})
+    if not isinstance(werte, dict):
+        werte = {}
+    return [
+        _SKIPPED_SECTION if skip else _aktuell_section(werte, metric)
+        for metric, skip in zip(SUPPORTED_METRICS, skipped)
+    ]
+
+
+def extract_apartment_readings(
+    payload: list[dict[str, Any]],
+    previous: ReadingsSnapshot | None = None,
+    metrics: Collection[str] = SUPPORTED_METRICS,
+) -> list[ApartmentReading]:
+    """Normalize API payload to apartment readings in one pass.
+
+    Readings, values and series that equal those in `previous` are reused,
+    so an unchanged apartment keeps its identity across refreshes. Metrics
+    not in `metrics` are not looked at; their slots stay empty.
+
+    Neither the payload nor `previous` is modified and the only shared state
+    are memoization caches, so this may run in an executor thread.
+    """
+    skipped = [metric not in metrics for metric in SUPPORTED_METRICS]
     readings: list[ApartmentReading] = []
 
     for index, item in enumerate(payload, start=1):
         if not isinstance(item, dict):
             continue
 
-        title1 = str(item.get("title1") or "")
-        title2 = str(item.get("title2") or "")
+        title1 = sys.intern(str(item.get("title1") or ""))
+        title2 = sys.intern(str(item.get("title2") or ""))
         status_raw = item.get("status")
-        status = str(status_raw) if status_raw is not None else None
+        status = sys.intern(str(status_raw)) if status_raw is not None else None
         apartment_key = _build_apartment_key(title1, title2, fallback_index=index)
 
-        werte = item.get("werte", {})
-        if not isinstance(werte, dict):
-            werte = {}
-
-        values: dict[str, MonthlyValue | None] = {}
-        jahreswerte: dict[str, float | None] = {}
-
-        for metric in SUPPORTED_METRICS:
-            metric_obj = werte.get(metric, {})
-            if not isinstance(metric_obj, dict):
-                metric_obj = {}
-            aktuell = metric_obj.get("aktuell", {})
-            if not isinstance(aktuell, dict):
-                aktuell = {}
-
-            values[metric] = get_latest_month_value(aktuell)
-            jahreswerte[metric] = _safe_float(aktuell.get("jahreswert"))
-
-        readings.append(
-            ApartmentReading(
-                apartment_key=apartment_key,
-                title1=title1,
-                title2=title2,
-                status=status,
-                values=values,
-                jahreswerte=jahreswerte,
-            )
+        sections = _apartment_sections(item, skipped)
+        # The latest value is the newest series entry; sections are read once.
+        series = tuple(map(get_monthly_series, sections))
+        reading = ApartmentReading(
+            apartment_key=apartment_key,
+            title1=title1,
+            title2=title2,
+            status=status,
+            latest=tuple(map(_newest, series)),
+            annual=tuple(_safe_float(section.get("jahreswert")) for section in sections),
+            series=series,
         )
+        before = None if previous is None else previous.get(apartment_key)
+        if before is not None:
+            reading = _reuse_unchanged(before, reading)
+        readings.append(reading)
 
     return readings
+
+
+def _reuse_unchanged(
+    previous: ApartmentReading, current: ApartmentReading
+) -> ApartmentReading:
+    """Return previous if nothing changed, else current sharing equal parts."""
+    series = tuple(map(_reuse, previous.series, current.series))
+    latest = tuple(map(_reuse, previous.latest, current.latest))
+    annual = _reuse(previous.annual, current.annual)
+    if (
+        annual is previous.annual
+        and previous.title1 == current.title1
+        and previous.title2 == current.title2
+        and previous.status == current.status
+        and all(map(is_, series, previous.series))
+        and all(map(is_, latest, previous.latest))
+    ):
+        return previous
+    current.series = series
+    current.latest = latest
+    current.annual = annual
+    return current
@@ -0,0 +1,174 @@
+"""Render sensor states once per refresh, keyed by entity unique id."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import NamedTuple
+
+from .aggregates import AGGREGATES, ConsumptionAggregates, ConsumptionEngine
+from .const import DOMAIN, SUPPORTED_METRICS
+from .models import ApartmentReading, ReadingsSnapshot
+
+
+class MetricState(NamedTuple):
+    """What one sensor renders: availability, value and attributes.
+
+    The attribute dict is shared by every reader and must not be modified.
+    """
+
+    available: bool
+    native_value: float | None
+    attributes: dict[str, str | bool | float | None]
+
+
+UNAVAILABLE_STATE = MetricState(available=False, native_value=None, attributes={})
+
+
+def derived_key(metric: str, aggregate: str) -> str:
+    """Return the entity key of a derived sensor of a metric."""
+    return f"{metric}_{aggregate}"
+
+
+def sensor_unique_id(apartment_key: str, key: str) -> str:
+    """Return the unique id of an apartment sensor with the given entity key."""
+    return f"{DOMAIN}_{apartment_key}_{key}"
+
+
+# Entity keys of an apartment in render order: the metric sensors, then the
+# derived sensors of each metric.
+SENSOR_KEYS: tuple[str, ...] = SUPPORTED_METRICS + tuple(
+    derived_key(metric, aggregate)
+    for metric in SUPPORTED_METRICS
+    for aggregate in AGGREGATES
+)
+# The metric behind each entry of SENSOR_KEYS.
+SENSOR_METRICS: tuple[str, ...] = SUPPORTED_METRICS + tuple(
+    metric for metric in SUPPORTED_METRICS for _ in AGGREGATES
+)
+
+ALL_METRICS = frozenset(SUPPORTED_METRICS)
+
+# Unique id suffix of every derived sensor, and the metric it is derived from.
+_DERIVED_SUFFIXES: dict[str, str] = {
+    f"_{derived_key(metric, aggregate)}": metric
+    for metric in SUPPORTED_METRICS
+    for aggregate in AGGREGATES
+}
+_DERIVED_SUFFIX_TUPLE = tuple(_DERIVED_SUFFIXES)
+
+
+def derived_metric(unique_id: str) -> str | None:
+    """Return the metric of a derived sensor's unique id, None for other sensors."""
+    if not unique_id.endswith(_DERIVED_SUFFIX_TUPLE):
+        return None
+    for suffix, metric in _DERIVED_SUFFIXES.items():
+        if unique_id.endswith(suffix):
+            return metric
+    return None
+
+
+def _render_apartment(
+    apartment: ApartmentReading,
+    aggregates: tuple[ConsumptionAggregates | None, ...],
+) -> list[MetricState]:
+    """Render the states of all sensors of an apartment, in SENSOR_KEYS order."""
+    title1, title2, status = apartment.title1, apartment.title2, apartment.status
+    states = [
+        MetricState(
+            value is not None,
+            None if value is None else value.wert,
+            {
+                "title1": title1,
+                "title2": title2,
+                "status": status,
+                "last_month_date": None if value is None else value.datum,
+                "estimated": None if value is None else value.estimated,
+                "jahreswert": annual,
+            },
+        )
+        for value, annual in zip(apartment.latest, apartment.annual)
+    ]
+    for derived in aggregates:
+        if derived is None:
+            states.extend(UNAVAILABLE_STATE for _ in AGGREGATES)
+            continue
+        attributes = {"last_month_date": derived.month}
+        for aggregate in AGGREGATES:
+            figure = derived.get(aggregate)
+            states.append(MetricState(figure is not None, figure, attributes))
+    return states
+
+
+class RenderCache:
+    """Rendered sensor states of one account, including derived figures.
+
+    Only apartments that are not the identical object of the previous
+    snapshot are rendered again; the parser reuses unchanged readings.
+    Derived figures are only computed for the metrics passed as `derived`.
+
+    update() fills new mappings and swaps them in when done, so it may run in
+    an executor thread while the event loop reads the previous states.
+    """
+
+    def __init__(self) -> None:
+        self.consumption = ConsumptionEngine()
+        self.derived = ALL_METRICS
+        self._snapshot: ReadingsSnapshot | None = None
+        self._states: dict[str, MetricState] = {}
+        self._unique_ids: dict[str, tuple[str, ...]] = {}
+        self.rendered = 0
+
+    def update(
+        self, snapshot: ReadingsSnapshot, derived: frozenset[str] = ALL_METRICS
+    ) -> frozenset[str]:
+        """Render a new snapshot; return the unique ids whose state changed."""
+        before = self._snapshot
+        if derived != self.derived:
+            # Derived sensors were enabled or disabled: render every apartment.
+            before = None
+        elif snapshot is before:
+            return frozenset()
+        states = dict(self._states)
+        unique_ids = dict(self._unique_ids)
+        changed: set[str] = set()
+        for apartment_key, apartment in snapshot.by_key.items():
+            if before is not None and before.get(apartment_key) is apartment:
+                continue
+            ids = unique_ids.get(apartment_key)
+            if ids is None:
+                ids = unique_ids[apartment_key] = tuple(
+                    sensor_unique_id(apartment_key, key) for key in SENSOR_KEYS
+                )
+            rendered = _render_apartment(
+                apartment, self.consumption.update(apartment, derived)
+            )
+            for unique_id, state in zip(ids, rendered):
+                if state != states.get(unique_id):
+                    changed.add(unique_id)
+                    states[unique_id] = state
+            self.rendered += len(ids)
+
+        # Vanished apartments must be written once so their sensors go unavailable.
+        if vanished := unique_ids.keys() - snapshot.by_key.keys():
+            for apartment_key in vanished:
+                for unique_id in unique_ids.pop(apartment_key):
+                    states.pop(unique_id, None)
+                    changed.add(unique_id)
+            self.consumption.forget(vanished)
+
+        self._states = states
+        self._unique_ids = unique_ids
+        self._snapshot = snapshot
+        self.derived = derived
+        return frozenset(changed)
+
+    def unique_ids(self) -> Iterable[tuple[str, ...]]:
+        """Return the sensor unique ids of every apartment, ordered as SENSOR_KEYS."""
+        return self._unique_ids.values()
+
+    def get(self, unique_id: str) -> MetricState:
+        """Return the rendered state of a sensor, unavailable if unknown."""
+        return self._states.get(unique_id, UNAVAILABLE_STATE)
+
+    def __len__(self) -> int:
+        return len(self._states)
@@ -0,0 +1,145 @@
+"""Retry policy, circuit breaker and rate limiter used by the API client."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+import random
+import time
+from typing import Any
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """Bounded exponential backoff with full jitter."""
+
+    attempts: int = 3
+    base_delay: float = 2.0
+    max_delay: float = 30.0
+
+    def delay(self, retry: int) -> float:
+        """Return the sleep before retry number `retry` (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))
+
+
+class CircuitBreaker:
+    """Fail fast after repeated failures until a cool-down has passed.
+
+    After `failure_threshold` consecutive failures the breaker opens and
+    rejects requests. Once `reset_timeout` seconds have passed a single
+    probe request is let through (half-open); its outcome closes or
+    re-opens the breaker. If the probe reports no outcome, another one is
+    let through after `reset_timeout`.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        """Return the current breaker state."""
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Return whether a request may be sent now."""
+        if self._state == STATE_CLOSED:
+            return True
+        # A probe that never reported back (e.g. cancelled) expires as well.
+        if (now := self._clock()) - self._opened_at >= self._reset_timeout:
+            self._state = STATE_HALF_OPEN
+            self._opened_at = now
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """Close the breaker after a request reached the portal."""
+        self._state = STATE_CLOSED
+        self._failures = 0
+
+    def record_failure(self) -> None:
+        """Count a transient failure and open the breaker at the threshold."""
+        self._failures += 1
+        if self._state == STATE_HALF_OPEN or self._failures >= self._failure_threshold:
+            if self._state != STATE_OPEN:
+                self.opened += 1
+            self._state = STATE_OPEN
+            self._opened_at = self._clock()
+
+    def as_diagnostics(self) -> dict[str, Any]:
+        """Return breaker state for diagnostics."""
+        return {
+            "state": self._state,
+            "consecutive_failures": self._failures,
+            "times_opened": self.opened,
+            "rejected_requests": self.rejected,
+        }
+
+
+class RateLimiter:
+    """Token bucket capping the request rate of all accounts together.
+
+    Up to `burst` requests may be sent back to back; after that requests
+    are spaced evenly at `requests_per_minute`. Waiters are served in order.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._rate = requests_per_minute / 60
+        self._capacity = float(burst)
+        self._tokens = float(burst)
+        self._clock = clock
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+        self.requests_per_minute = requests_per_minute
+        self.delayed = 0
+        self.waited = 0.0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                delay = (1 - self._tokens) / self._rate
+                self.delayed += 1
+                self.waited += delay
+                await asyncio.sleep(delay)
+                self._refill()
+            self._tokens -= 1
+
+    def as_diagnostics(self) -> dict[str, Any]:
+        """Return limiter settings and how often requests had to wait."""
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "burst": int(self._capacity),
+            "delayed_requests": self.delayed,
+            "seconds_waited": round(self.waited, 1),
+        }
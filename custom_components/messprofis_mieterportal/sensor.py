@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import logging
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -11,20 +12,50 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfEnergy
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfEnergy,
+    UnitOfInformation,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from .aggregates import (
+    AGGREGATE_JAHRESWERT_PERCENT,
+    AGGREGATE_MONTH_DELTA,
+    AGGREGATE_ROLLING_12_MONTHS,
+    AGGREGATE_YEAR_TO_DATE,
+    AGGREGATES,
+)
 from .const import (
     DOMAIN,
     METRIC_COLD_WATER,
     METRIC_HEATING,
     METRIC_HOT_WATER_ENERGY,
     METRIC_HOT_WATER_VOLUME,
+    METRIC_LABELS,
+    SIGNAL_METRICS_UPDATED,
+    SUPPORTED_METRICS,
 )
 from .coordinator import MessProfisDataUpdateCoordinator
-from .models import ApartmentReading, MonthlyValue
+from .instrumentation import (
+    PHASE_DECODE,
+    PHASE_DISPATCH,
+    PHASE_NETWORK,
+    PHASE_PARSE,
+    PHASE_RESPONSE_SIZE,
+    PHASE_TRANSFER_SIZE,
+)
+from .models import ApartmentReading
+from .render import SENSOR_KEYS, SENSOR_METRICS, derived_key, sensor_unique_id
+
+_LOGGER = logging.getLogger(__name__)
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -74,6 +105,116 @@ SENSOR_DESCRIPTIONS: tuple[MessProfisSensorDescription, ...] = (
 )
 
 
+_AGGREGATE_LABELS: dict[str, str] = {
+    AGGREGATE_MONTH_DELTA: "Veränderung zum Vormonat",
+    AGGREGATE_YEAR_TO_DATE: "seit Jahresbeginn",
+    AGGREGATE_ROLLING_12_MONTHS: "letzte 12 Monate",
+    AGGREGATE_JAHRESWERT_PERCENT: "12 Monate zum Jahreswert",
+}
+
+
+def _derived_description(
+    base: MessProfisSensorDescription, aggregate: str
+) -> MessProfisSensorDescription:
+    """Describe a sensor derived from the monthly series of a metric."""
+    if aggregate == AGGREGATE_JAHRESWERT_PERCENT:
+        unit, device_class = PERCENTAGE, None
+    elif aggregate == AGGREGATE_MONTH_DELTA:
+        # Deltas may be negative, which energy and water sensors do not allow.
+        unit, device_class = base.native_unit_of_measurement, None
+    else:
+        unit, device_class = base.native_unit_of_measurement, base.device_class
+    return MessProfisSensorDescription(
+        key=derived_key(base.metric_key, aggregate),
+        metric_key=base.metric_key,
+        name=f"{METRIC_LABELS[base.metric_key]} {_AGGREGATE_LABELS[aggregate]}",
+        icon=base.icon,
+        native_unit_of_measurement=unit,
+        device_class=device_class,
+        state_class=SensorStateClass.MEASUREMENT,
+        # Four per metric and apartment; large accounts opt in where needed.
+        entity_registry_enabled_default=False,
+    )
+
+
+DERIVED_SENSOR_DESCRIPTIONS: tuple[MessProfisSensorDescription, ...] = tuple(
+    _derived_description(base, aggregate)
+    for base in SENSOR_DESCRIPTIONS
+    for aggregate in AGGREGATES
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class MessProfisDiagnosticSensorDescription(SensorEntityDescription):
+    """Descriptor of a refresh instrumentation sensor."""
+
+    phase: str
+
+
+DIAGNOSTIC_SENSOR_DESCRIPTIONS: tuple[MessProfisDiagnosticSensorDescription, ...] = (
+    MessProfisDiagnosticSensorDescription(
+        key="refresh_network_time",
+        phase=PHASE_NETWORK,
+        name="Abruf Netzwerkzeit",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    MessProfisDiagnosticSensorDescription(
+        key="refresh_decode_time",
+        phase=PHASE_DECODE,
+        name="Abruf Dekodierzeit",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    MessProfisDiagnosticSensorDescription(
+        key="refresh_parse_time",
+        phase=PHASE_PARSE,
+        name="Abruf Verarbeitungszeit",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    MessProfisDiagnosticSensorDescription(
+        key="refresh_dispatch_time",
+        phase=PHASE_DISPATCH,
+        name="Abruf Verteilzeit",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    MessProfisDiagnosticSensorDescription(
+        key="response_size",
+        phase=PHASE_RESPONSE_SIZE,
+        name="Antwortgröße",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    MessProfisDiagnosticSensorDescription(
+        key="transfer_size",
+        phase=PHASE_TRANSFER_SIZE,
+        name="Übertragene Datenmenge",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -81,19 +222,109 @@ async def async_setup_entry(
 ) -> None:
     """Set up MessProfis sensors from config entry."""
     coordinator: MessProfisDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    device_registry = dr.async_get(hass)
+    registered = {
+        identifier
+        for device in dr.async_entries_for_config_entry(device_registry, entry.entry_id)
+        for domain, identifier in device.identifiers
+        if domain == DOMAIN and identifier != entry.entry_id
+    }
+    known: set[str] = set()
+    descriptions = tuple(
+        description
+        for description in SENSOR_DESCRIPTIONS + DERIVED_SENSOR_DESCRIPTIONS
+        if description.metric_key in coordinator.selected_metrics
+    )
 
-    entities: list[MessProfisSensor] = []
-    for apartment in coordinator.data:
-        for description in SENSOR_DESCRIPTIONS:
-            entities.append(MessProfisSensor(coordinator, apartment, description))
+    @callback
+    def _async_sync_apartments() -> None:
+        """Add sensors of new apartments and remove the devices of vanished ones."""
+        if coordinator.data is None:
+            return
+        entities: list[MessProfisSensor] = []
+        for apartment in coordinator.data.apartments:
+            if apartment.apartment_key in known:
+                continue
+            known.add(apartment.apartment_key)
+            device_info = _apartment_device_info(apartment)
+            for description in descriptions:
+                entities.append(
+                    MessProfisSensor(coordinator, apartment, description, device_info)
+                )
+        if entities:
+            async_add_entities(entities)
 
-    async_add_entities(entities)
+        if vanished := known - coordinator.data.by_key.keys():
+            known.difference_update(vanished)
+            _async_remove_apartments(hass, entry, vanished)
+        if entities or vanished:
+            _LOGGER.debug(
+                "%s: %d sensors added, %d apartments removed",
+                entry.title,
+                len(entities),
+                len(vanished),
+            )
+
+    _async_sync_apartments()
+    # Apartments that disappeared while Home Assistant was not running.
+    if stale := registered - known:
+        _async_remove_apartments(hass, entry, stale)
+    if unselected := set(SUPPORTED_METRICS).difference(coordinator.selected_metrics):
+        _async_remove_metric_sensors(hass, coordinator, unselected)
+    entry.async_on_unload(coordinator.async_add_listener(_async_sync_apartments))
+
+    async_add_entities(
+        MessProfisDiagnosticSensor(coordinator, description)
+        for description in DIAGNOSTIC_SENSOR_DESCRIPTIONS
+    )
+
+
+@callback
+def _async_remove_apartments(
+    hass: HomeAssistant, entry: ConfigEntry, apartment_keys: set[str]
+) -> None:
+    """Detach the devices of apartments from the entry, removing their sensors."""
+    device_registry = dr.async_get(hass)
+    for apartment_key in apartment_keys:
+        device = device_registry.async_get_device(identifiers={(DOMAIN, apartment_key)})
+        if device is not None:
+            device_registry.async_update_device(
+                device.id, remove_config_entry_id=entry.entry_id
+            )
+
+
+def _apartment_device_info(apartment: ApartmentReading) -> DeviceInfo:
+    """Return the device of an apartment, shared by its metric sensors."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, apartment.apartment_key)},
+        name=f"MessProfis {apartment.display_name}",
+        manufacturer="Mess-Profis",
+        model="Mieterportal",
+    )
+
+
+@callback
+def _async_remove_metric_sensors(
+    hass: HomeAssistant,
+    coordinator: MessProfisDataUpdateCoordinator,
+    metrics: set[str],
+) -> None:
+    """Remove the sensors of metrics that were deselected in the options."""
+    entity_registry = er.async_get(hass)
+    for apartment_key in coordinator.data.by_key:
+        for key, metric in zip(SENSOR_KEYS, SENSOR_METRICS):
+            if metric in metrics and (
+                entity_id := entity_registry.async_get_entity_id(
+                    "sensor", DOMAIN, sensor_unique_id(apartment_key, key)
+                )
+            ):
+                entity_registry.async_remove(entity_id)
 
 
 class MessProfisSensor(
     CoordinatorEntity[MessProfisDataUpdateCoordinator], SensorEntity
 ):
-    """Representation of one MessProfis metric sensor."""
+    """One metric of an apartment, or a figure derived from its monthly series."""
 
     entity_description: MessProfisSensorDescription
     _attr_has_entity_name = True
@@ -103,65 +334,81 @@ class MessProfisSensor(
         coordinator: MessProfisDataUpdateCoordinator,
         apartment: ApartmentReading,
         description: MessProfisSensorDescription,
+        device_info: DeviceInfo | None = None,
     ) -> None:
         super().__init__(coordinator)
         self.entity_description = description
-        self._apartment_key = apartment.apartment_key
-        self._attr_unique_id = (
-            f"{DOMAIN}_{self._apartment_key}_{self.entity_description.metric_key}"
-        )
+        self._attr_unique_id = sensor_unique_id(apartment.apartment_key, description.key)
+        self._state = coordinator.rendered_state(self._attr_unique_id)
+        self._attr_device_info = device_info or _apartment_device_info(apartment)
+        self._attr_name = f"{apartment.display_name} {description.name}"
 
-        apartment_name = " ".join(
-            part.strip() for part in [apartment.title1, apartment.title2] if part and part.strip()
-        ).strip()
-        if not apartment_name:
-            apartment_name = apartment.apartment_key
-
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, apartment.apartment_key)},
-            "name": f"MessProfis {apartment_name}",
-            "manufacturer": "Mess-Profis",
-            "model": "Mieterportal",
-        }
-        self._attr_name = f"{apartment_name} {self.entity_description.name}"
-
-    def _current_apartment(self) -> ApartmentReading | None:
-        for apartment in self.coordinator.data:
-            if apartment.apartment_key == self._apartment_key:
-                return apartment
-        return None
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Pick up the state rendered by the coordinator and write it if changed."""
+        changed = self.coordinator.metric_changed(self._attr_unique_id)
+        self.coordinator.record_entity_update(changed)
+        if changed:
+            self._state = self.coordinator.rendered_state(self._attr_unique_id)
+            super()._handle_coordinator_update()
 
     @property
     def available(self) -> bool:
         """Return whether the entity is available."""
-        apartment = self._current_apartment()
-        if apartment is None:
-            return False
-        return apartment.values.get(self.entity_description.metric_key) is not None
+        return self._state.available
 
     @property
     def native_value(self) -> float | None:
-        """Return the latest monthly value."""
-        apartment = self._current_apartment()
-        if apartment is None:
-            return None
-        value = apartment.values.get(self.entity_description.metric_key)
-        return None if value is None else value.wert
+        """Return the latest monthly value or derived figure."""
+        return self._state.native_value
 
     @property
     def extra_state_attributes(self) -> dict[str, str | bool | float | None]:
         """Return sensor metadata as attributes."""
-        apartment = self._current_apartment()
-        if apartment is None:
-            return {}
-
-        metric_key = self.entity_description.metric_key
-        value: MonthlyValue | None = apartment.values.get(metric_key)
-        return {
-            "title1": apartment.title1,
-            "title2": apartment.title2,
-            "status": apartment.status,
-            "last_month_date": None if value is None else value.datum,
-            "estimated": None if value is None else value.estimated,
-            "jahreswert": apartment.jahreswerte.get(metric_key),
+        return self._state.attributes
+
+
+class MessProfisDiagnosticSensor(SensorEntity):
+    """Median of one refresh phase of an account, from rolling measurements."""
+
+    entity_description: MessProfisDiagnosticSensorDescription
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        coordinator: MessProfisDataUpdateCoordinator,
+        description: MessProfisDiagnosticSensorDescription,
+    ) -> None:
+        self.entity_description = description
+        self._coordinator = coordinator
+        entry = coordinator.config_entry
+        self._attr_unique_id = f"{DOMAIN}_{entry.entry_id}_{description.key}"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, entry.entry_id)},
+            "name": f"MessProfis {entry.title}",
+            "manufacturer": "Mess-Profis",
+            "model": "Mieterportal",
+            "entry_type": DeviceEntryType.SERVICE,
         }
+
+    async def async_added_to_hass(self) -> None:
+        """Update whenever the coordinator recorded new measurements."""
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_METRICS_UPDATED.format(self._coordinator.config_entry.entry_id),
+                self.async_write_ha_state,
+            )
+        )
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the median of the retained samples."""
+        value = self._coordinator.metrics.get(self.entity_description.phase).percentile(50)
+        return None if value is None else round(value, 2)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, float | int | None]:
+        """Return count, last value and percentiles."""
+        return self._coordinator.metrics.get(self.entity_description.phase).as_dict()
@@ -0,0 +1,196 @@
+"""Incremental import of the monthly history into long-term statistics."""
+
+from __future__ import annotations
+
+from datetime import datetime
+import logging
+from typing import Any
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.const import UnitOfEnergy, UnitOfVolume
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    METRIC_COLD_WATER,
+    METRIC_HEATING,
+    METRIC_HOT_WATER_ENERGY,
+    METRIC_HOT_WATER_VOLUME,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    SUPPORTED_METRICS,
+)
+from .models import MonthlySeries, MonthlyValue, ReadingsSnapshot
+from .parser import month_key, parse_iso_date
+
+try:
+    from homeassistant.components.recorder.models import StatisticMeanType
+except ImportError:  # Home Assistant before 2025.4
+    StatisticMeanType = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# The statistics have no mean; older releases only know the has_mean flag.
+_NO_MEAN: dict[str, Any] = (
+    {"has_mean": False}
+    if StatisticMeanType is None
+    else {"mean_type": StatisticMeanType.NONE}
+)
+
+METRIC_STATISTICS: dict[str, tuple[str, str]] = {
+    METRIC_HEATING: ("Heizung", UnitOfEnergy.KILO_WATT_HOUR),
+    METRIC_COLD_WATER: ("Kaltwasser", UnitOfVolume.CUBIC_METERS),
+    METRIC_HOT_WATER_ENERGY: ("Warmwasser", UnitOfEnergy.KILO_WATT_HOUR),
+    METRIC_HOT_WATER_VOLUME: ("Warmwasser (m3)", UnitOfVolume.CUBIC_METERS),
+}
+
+# Per imported month: [wert, estimated, sum including this month].
+ImportedMonths = dict[str, list[Any]]
+
+
+def statistics_storage_key(entry_id: str) -> str:
+    """Return the storage key holding an entry's import watermarks."""
+    return f"{DOMAIN}.{entry_id}.statistics"
+
+
+def statistic_id(apartment_key: str, metric: str) -> str:
+    """Return the external statistic id of an apartment metric."""
+    return f"{DOMAIN}:{apartment_key}_{metric.lower()}"
+
+
+def _month_start(datum: str) -> datetime:
+    """Return the start of the month a portal date belongs to, in UTC."""
+    parsed = parse_iso_date(datum)
+    return dt_util.as_utc(
+        datetime(parsed.year, parsed.month, 1, tzinfo=dt_util.get_default_time_zone())
+    )
+
+
+def _rows_to_import(
+    series: MonthlySeries, imported: ImportedMonths
+) -> tuple[str | None, list[tuple[str, MonthlyValue]]]:
+    """Return the first month to (re)import and the affected series entries.
+
+    New months after the watermark are imported, and a month whose estimate
+    flag flipped is re-imported. Because sums are cumulative, every month
+    after the earliest such month is written again as well.
+    """
+    watermark = max(imported) if imported else None
+    restart: str | None = None
+    keyed = [(month_key(value.datum), value) for value in series]
+
+    for key, value in keyed:
+        known = imported.get(key)
+        if known is None:
+            if watermark is not None and key < watermark:
+                continue
+        elif bool(known[1]) == value.estimated:
+            continue
+        if restart is None or key < restart:
+            restart = key
+
+    if restart is None:
+        return None, []
+    return restart, [(key, value) for key, value in keyed if key >= restart]
+
+
+class MessProfisStatisticsImporter:
+    """Import monthly values as external statistics, tracking a watermark."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._hass = hass
+        self._store: Store[dict[str, ImportedMonths]] = Store(
+            hass, STORAGE_VERSION, statistics_storage_key(entry_id)
+        )
+        self._imported: dict[str, ImportedMonths] | None = None
+        # The series last imported per apartment and metric; the parser keeps
+        # an unchanged series as the identical object.
+        self._last_series: dict[tuple[str, str], MonthlySeries] = {}
+        self.rows_imported = 0
+        self.series_skipped = 0
+
+    async def async_import(self, snapshot: ReadingsSnapshot) -> int:
+        """Import new or revised months of every series; return rows written."""
+        if self._imported is None:
+            self._imported = await self._store.async_load() or {}
+
+        written = 0
+        last_series = self._last_series
+        seen: dict[tuple[str, str], MonthlySeries] = {}
+        for apartment in snapshot:
+            for metric, series in zip(SUPPORTED_METRICS, apartment.series):
+                if metric not in METRIC_STATISTICS or not series:
+                    continue
+                key = (apartment.apartment_key, metric)
+                seen[key] = series
+                if last_series.get(key) is series:
+                    self.series_skipped += 1
+                    continue
+                written += self._import_series(
+                    statistic_id(apartment.apartment_key, metric),
+                    apartment.display_name,
+                    metric,
+                    series,
+                )
+        self._last_series = seen
+
+        if written:
+            self.rows_imported += written
+            self._store.async_delay_save(lambda: self._imported, STORAGE_SAVE_DELAY)
+        return written
+
+    def _import_series(
+        self,
+        stat_id: str,
+        name: str,
+        metric: str,
+        series: MonthlySeries,
+    ) -> int:
+        """Queue the rows of one series that are missing from the recorder."""
+        assert self._imported is not None
+        imported = self._imported.setdefault(stat_id, {})
+        restart, rows = _rows_to_import(series, imported)
+        if restart is None:
+            return 0
+
+        previous = [key for key in imported if key < restart]
+        running_sum = float(imported[max(previous)][2]) if previous else 0.0
+        for key in [key for key in imported if key >= restart]:
+            del imported[key]
+
+        statistics: list[StatisticData] = []
+        for key, value in rows:
+            try:
+                start = _month_start(value.datum)
+            except ValueError:
+                continue
+            running_sum += value.wert
+            statistics.append(StatisticData(start=start, state=value.wert, sum=running_sum))
+            imported[key] = [value.wert, value.estimated, running_sum]
+
+        if not statistics:
+            return 0
+
+        label, unit = METRIC_STATISTICS[metric]
+        metadata = StatisticMetaData(
+            **_NO_MEAN,
+            has_sum=True,
+            name=f"MessProfis {name} {label}",
+            source=DOMAIN,
+            statistic_id=stat_id,
+            unit_of_measurement=unit,
+        )
+        async_add_external_statistics(self._hass, metadata, statistics)
+        _LOGGER.debug("Imported %d monthly rows into %s", len(statistics), stat_id)
+        return len(statistics)
+
+    def as_diagnostics(self) -> dict[str, Any]:
+        """Return import state for the diagnostics download."""
+        return {
+            "series": 0 if self._imported is None else len(self._imported),
+            "rows_imported": self.rows_imported,
+            "series_skipped": self.series_skipped,
+        }
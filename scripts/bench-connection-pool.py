@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Compare fresh connections per request with the pooled MessProfisHttpClient.
+
+Runs against a local keep-alive stand-in server, optionally over TLS with a
+throw-away self-signed certificate (requires the openssl command).
+"""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from pathlib import Path
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from api_client import MessProfisHttpClient  # noqa: E402
+from payload_generator import generate_payload  # noqa: E402
+
+
+def _make_handler(body: bytes) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately; avoid Nagle stalls on reuse.
+        disable_nagle_algorithm = True
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+        def do_POST(self) -> None:
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def _self_signed(directory: Path) -> tuple[Path, Path]:
+    cert, key = directory / "cert.pem", directory / "key.pem"
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", str(key), "-out", str(cert), "-days", "1",
+            "-subj", "/CN=localhost",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+def _run(client_factory, requests: int, workers: int, close: bool) -> float:
+    """Return requests per second for the given client strategy."""
+    def one(_: int) -> None:
+        client = client_factory()
+        client.fetch("bench@example.com", "hash")
+        if close:
+            client.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(one, range(requests)))
+    return requests / (time.perf_counter() - started)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--apartments", type=int, default=2)
+    parser.add_argument("--tls", action="store_true")
+    args = parser.parse_args()
+
+    body = json.dumps(generate_payload(args.apartments, months=12)).encode("utf-8")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(body))
+    server.request_queue_size = 128
+    context: ssl.SSLContext | None = None
+    scheme = "http"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.tls:
+            cert, key = _self_signed(Path(tmp))
+            server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            server_context.load_cert_chain(cert, key)
+            server.socket = server_context.wrap_socket(server.socket, server_side=True)
+            context = ssl.create_default_context(cafile=str(cert))
+            context.check_hostname = False
+            scheme = "https"
+
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"{scheme}://127.0.0.1:{server.server_port}/api/Mieter/Login"
+        print(f"{scheme} stand-in, {len(body)} byte payload, {args.requests} requests")
+
+        shared = MessProfisHttpClient(url, ssl_context=context)
+
+        def fresh() -> MessProfisHttpClient:
+            # Mirrors the old behaviour: a new connection for every call.
+            return MessProfisHttpClient(url, max_idle_connections=1, ssl_context=context)
+
+        for workers in args.workers:
+            fresh_rate = _run(fresh, args.requests, workers, close=True)
+            pooled_rate = _run(lambda: shared, args.requests, workers, close=False)
+            print(
+                f"workers {workers:>3}: fresh {fresh_rate:8.1f} req/s  "
+                f"pooled {pooled_rate:8.1f} req/s  ({pooled_rate / fresh_rate:.1f}x)"
+            )
+        print(
+            f"pooled client opened {shared.connections_opened} connections, "
+            f"reused {shared.connections_reused} times"
+        )
+        shared.close()
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Compare peak memory and time of full JSON decoding vs. the streaming decoders.
+
+Measures json.loads, the streaming decoder of the standalone api_client and
+the one of the integration (decoder.decode_payload), which also prunes every
+apartment to the fields the parser reads.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from api_client import (  # noqa: E402
+    READ_CHUNK_SIZE,
+    PayloadStreamDecoder,
+    extract_latest_values,
+)
+from benchmark import load_integration_module  # noqa: E402
+from payload_generator import generate_payload  # noqa: E402
+
+decoder = load_integration_module("decoder")
+
+
+def build_body(apartments: int, months: int) -> bytes:
+    """Build a payload resembling a multi-unit account."""
+    payload = generate_payload(apartments, months=months)
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _full_decode(body: bytes) -> list:
+    return json.loads(body.decode("utf-8"))
+
+
+def _stream_decode(body: bytes) -> list:
+    decoder = PayloadStreamDecoder()
+    view = memoryview(body)
+    for start in range(0, len(body), READ_CHUNK_SIZE):
+        decoder.feed(bytes(view[start : start + READ_CHUNK_SIZE]))
+    return decoder.finish()
+
+
+def _measure(func, body: bytes) -> tuple[float, int, list]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func(body)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--apartments", type=int, default=500)
+    parser.add_argument("--months", type=int, default=36)
+    args = parser.parse_args()
+
+    body = build_body(args.apartments, args.months)
+    print(f"payload: {len(body) / 1e6:.1f} MB, {args.apartments} apartments")
+
+    summaries = []
+    for name, func in (
+        ("json.loads", _full_decode),
+        ("streaming", _stream_decode),
+        ("integration", decoder.decode_payload),
+    ):
+        elapsed, peak, result = _measure(func, body)
+        summaries.append(extract_latest_values(result))
+        print(f"{name:<12} {elapsed * 1000:8.1f} ms  peak {peak / 1e6:8.1f} MB")
+
+    if any(summary != summaries[0] for summary in summaries[1:]):
+        print("ERROR: decoders produced different summaries")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Measure how much memory parsed readings keep alive between refreshes.
+
+Parses a synthetic account twice, as two consecutive refreshes with an
+unchanged payload, and reports the memory retained by the snapshots
+(tracemalloc) and the growth of the process' resident set size.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import inspect
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from benchmark import load_integration_module  # noqa: E402
+from payload_generator import generate_payload  # noqa: E402
+
+parser = load_integration_module("parser")
+models = load_integration_module("models")
+
+
+def _rss_kib() -> int | None:
+    """Return the current resident set size, where /proc is available."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _refresh(payload, previous):
+    """Parse one refresh, handing over the previous snapshot if supported."""
+    if previous is not None and "previous" in inspect.signature(
+        parser.extract_apartment_readings
+    ).parameters:
+        readings = parser.extract_apartment_readings(payload, previous=previous)
+    else:
+        readings = parser.extract_apartment_readings(payload)
+    return models.ReadingsSnapshot.from_readings(readings)
+
+
+def main() -> int:
+    argp = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argp.add_argument("--apartments", type=int, default=10000)
+    argp.add_argument("--months", type=int, default=24)
+    args = argp.parse_args()
+
+    payload = generate_payload(args.apartments, months=args.months, seed=1)
+    print(f"{args.apartments} apartments, {args.months} months")
+
+    gc.collect()
+    rss_before = _rss_kib()
+    started = time.perf_counter()
+    first = _refresh(payload, None)
+    first_ms = (time.perf_counter() - started) * 1000
+    gc.collect()
+    rss_first = _rss_kib()
+    started = time.perf_counter()
+    second = _refresh(payload, first)
+    second_ms = (time.perf_counter() - started) * 1000
+    gc.collect()
+    rss_second = _rss_kib()
+    reused = sum(1 for a, b in zip(first, second) if a is b)
+    print(f"parse: first {first_ms:.0f} ms, second {second_ms:.0f} ms, "
+          f"{reused}/{len(second)} readings reused")
+    if rss_before is not None:
+        print(f"RSS growth: first snapshot {(rss_first - rss_before) / 1024:.1f} MiB, "
+              f"both snapshots {(rss_second - rss_before) / 1024:.1f} MiB")
+    del first, second
+    gc.collect()
+
+    tracemalloc.start()
+    first = _refresh(payload, None)
+    gc.collect()
+    one = tracemalloc.get_traced_memory()[0]
+    second = _refresh(payload, first)
+    gc.collect()
+    both = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"retained: one snapshot {one / 2**20:.1f} MiB, "
+          f"two consecutive snapshots {both / 2**20:.1f} MiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Benchmark the parsing and sensor state-render hot paths.
+
+Measures parse time and tracemalloc peak for the integration parser
+(extract_apartment_readings), the standalone api_client summary
+(extract_latest_values) and a simulation of the sensor property path,
+at several account sizes. Results can be stored as a baseline and later
+runs compared against it.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable
+import importlib
+import json
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+import types
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+INTEGRATION_DIR = ROOT / "custom_components" / "messprofis_mieterportal"
+BASELINE_FILE = Path(__file__).resolve().parent / "benchmark_baseline.json"
+DEFAULT_SIZES = (1, 100, 1000, 10000)
+
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import api_client  # noqa: E402
+from payload_generator import generate_payload  # noqa: E402
+
+
+def load_integration_module(name: str) -> types.ModuleType:
+    """Import a Home Assistant independent module of the integration.
+
+    The package __init__ needs Home Assistant, so the package is registered
+    without executing it; parser, models, render, const and decoder import
+    cleanly.
+    """
+    package_name = INTEGRATION_DIR.name
+    if package_name not in sys.modules:
+        package = types.ModuleType(package_name)
+        package.__path__ = [str(INTEGRATION_DIR)]
+        sys.modules[package_name] = package
+    return importlib.import_module(f"{package_name}.{name}")
+
+
+parser = load_integration_module("parser")
+models = load_integration_module("models")
+render = load_integration_module("render")
+const = load_integration_module("const")
+
+
+def render_states(readings: list[Any]) -> list[tuple[bool, float | None, Any]]:
+    """Simulate one refresh of every MessProfisSensor of an account.
+
+    The coordinator renders each sensor state once into a cache keyed by
+    unique id; the entities then only read the cached fields.
+    """
+    snapshot = models.ReadingsSnapshot.from_readings(readings)
+    cache = render.RenderCache()
+    cache.update(snapshot)
+    states: list[tuple[bool, float | None, Any]] = []
+    for apartment in snapshot:
+        for metric in const.SUPPORTED_METRICS:
+            state = cache.get(render.sensor_unique_id(apartment.apartment_key, metric))
+            states.append((state.available, state.native_value, state.attributes))
+    return states
+
+
+def _time(func: Callable[[], Any], repeats: int) -> float:
+    """Return the best wall time of several runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def _peak(func: Callable[[], Any]) -> float:
+    """Return the tracemalloc peak of one run, in KiB."""
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def run(sizes: tuple[int, ...], months: int) -> dict[str, dict[str, float]]:
+    """Run all benchmarks and return metrics per apartment count."""
+    results: dict[str, dict[str, float]] = {}
+    for size in sizes:
+        payload = generate_payload(size, months=months, seed=size)
+        readings = parser.extract_apartment_readings(payload)
+        # A second refresh with an unchanged payload, as the coordinator sees it.
+        snapshot = models.ReadingsSnapshot.from_readings(readings)
+        cache = render.RenderCache()
+        cache.update(snapshot)
+        unchanged = models.ReadingsSnapshot.from_readings(
+            parser.extract_apartment_readings(payload, previous=snapshot)
+        )
+        repeats = max(1, min(5, 5000 // size))
+        cases: dict[str, Callable[[], Any]] = {
+            "parse": lambda: parser.extract_apartment_readings(payload),
+            "latest_values": lambda: api_client.extract_latest_values(payload),
+            "render": lambda: render_states(readings),
+            "render_unchanged": lambda: cache.update(unchanged),
+        }
+        metrics: dict[str, float] = {}
+        for name, func in cases.items():
+            metrics[f"{name}_ms"] = round(_time(func, repeats), 3)
+            metrics[f"{name}_peak_kib"] = round(_peak(func), 1)
+        results[str(size)] = metrics
+        print(
+            f"{size:>6} apartments  "
+            + "  ".join(f"{key} {value:.1f}" for key, value in metrics.items()),
+            flush=True,
+        )
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    """Return a description of every metric that regressed beyond tolerance."""
+    regressions: list[str] = []
+    for size, metrics in results.items():
+        for key, value in metrics.items():
+            reference = baseline.get(size, {}).get(key)
+            if reference and value > reference * (1 + tolerance):
+                regressions.append(
+                    f"{size} apartments {key}: {value:.1f} > baseline {reference:.1f}"
+                )
+    return regressions
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument(
+        "--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES)
+    )
+    arg_parser.add_argument("--months", type=int, default=24)
+    arg_parser.add_argument(
+        "--save-baseline", action="store_true", help=f"write {BASELINE_FILE.name}"
+    )
+    arg_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative slowdown against the baseline",
+    )
+    args = arg_parser.parse_args()
+
+    results = run(tuple(args.sizes), args.months)
+    if args.save_baseline:
+        BASELINE_FILE.write_text(
+            json.dumps({"months": args.months, "results": results}, indent=2) + "\n",
+            encoding="utf-8",
+        )
+        print(f"Baseline written to {BASELINE_FILE}")
+        return 0
+
+    if not BASELINE_FILE.exists():
+        return 0
+    baseline = json.loads(BASELINE_FILE.read_text(encoding="utf-8"))
+    if baseline.get("months") != args.months:
+        print("Baseline was recorded with a different month count, not comparing")
+        return 0
+    regressions = compare(results, baseline["results"], args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""Drive the MessProfis clients against the local stand-in server under load.
+
+Modes:
+  client       MessProfisApiClient on an aiohttp session (needs aiohttp)
+  sync         api_client.fetch_data from a thread pool
+  coordinator  the full integration in a throw-away Home Assistant instance
+               with an in-memory recorder (needs homeassistant)
+
+Every mode fetches N accounts for a number of rounds and reports
+throughput, latency percentiles, failures and memory. Unless --url is given,
+a stand-in server is started in a subprocess with the stand-in options.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+import importlib
+import json
+from pathlib import Path
+import resource
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import api_client  # noqa: E402
+from benchmark import INTEGRATION_DIR, load_integration_module  # noqa: E402
+import standin_server  # noqa: E402
+
+
+class Report:
+    """Collect per-request latencies and outcomes of one run."""
+
+    def __init__(self) -> None:
+        self.latencies: list[float] = []
+        self.outcomes: Counter[str] = Counter()
+        self.elapsed = 0.0
+        self.extra: dict[str, Any] = {}
+
+    def add(self, latency: float, outcome: str) -> None:
+        self.latencies.append(latency)
+        self.outcomes[outcome] += 1
+
+    def percentile(self, percent: float) -> float | None:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        rank = max(1, -(-len(ordered) * percent // 100))
+        return ordered[int(rank) - 1]
+
+    def print(self, mode: str) -> None:
+        total = len(self.latencies)
+        print(f"{mode}: {total} fetches in {self.elapsed:.2f} s "
+              f"({total / self.elapsed:.1f}/s)")
+        if total:
+            print("  latency ms  " + "  ".join(
+                f"p{percent} {self.percentile(percent) * 1000:.1f}"
+                for percent in (50, 90, 99)
+            ) + f"  max {max(self.latencies) * 1000:.1f}")
+        print("  outcomes    " + ", ".join(
+            f"{outcome} {count}" for outcome, count in self.outcomes.most_common()
+        ))
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        print(f"  memory      peak RSS {peak_rss / 1024:.1f} MiB", end="")
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            print(f", traced {current / 2**20:.1f} MiB (peak {peak / 2**20:.1f} MiB)",
+                  end="")
+        print()
+        for key, value in self.extra.items():
+            print(f"  {key:<11} {value}")
+
+
+async def _timed(report: Report, call: Callable[[], Awaitable[Any]]) -> None:
+    started = time.perf_counter()
+    try:
+        await call()
+    except Exception as err:  # noqa: BLE001 - every failure is an outcome
+        report.add(time.perf_counter() - started, type(err).__name__)
+    else:
+        report.add(time.perf_counter() - started, "ok")
+
+
+async def run_client(args: argparse.Namespace, url: str, accounts: list[str]) -> Report:
+    """Fetch all accounts per round through one MessProfisApiClient."""
+    import aiohttp
+
+    api = load_integration_module("api")
+    resilience = load_integration_module("resilience")
+    report = Report()
+    async with aiohttp.ClientSession(auto_decompress=False) as session:
+        client = api.MessProfisApiClient(
+            session,
+            retry_policy=resilience.RetryPolicy(
+                attempts=args.retries + 1, base_delay=args.retry_delay, max_delay=1.0
+            ),
+            max_concurrency=args.concurrency,
+            cache_ttl=0,
+            login_url=url,
+            rate_limiter=(
+                resilience.RateLimiter(args.requests_per_minute, burst=args.concurrency)
+                if args.requests_per_minute
+                else None
+            ),
+        )
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            await asyncio.gather(*(
+                _timed(report, lambda email=email: client.async_fetch_raw(email, "hash"))
+                for email in accounts
+            ))
+        report.elapsed = time.perf_counter() - started
+        diagnostics = client.as_diagnostics()
+    report.extra = {
+        "requests": diagnostics["requests"],
+        "retries": diagnostics["retries"],
+        "transfer": f"{diagnostics['bytes_received']} B wire, "
+        f"{diagnostics['bytes_decoded']} B decoded",
+    }
+    return report
+
+
+def run_sync(args: argparse.Namespace, url: str, accounts: list[str]) -> Report:
+    """Fetch all accounts per round with api_client.fetch_data in threads."""
+    report = Report()
+    policy = api_client.RetryPolicy(
+        attempts=args.retries + 1, base_delay=args.retry_delay, max_delay=1.0
+    )
+
+    def one(email: str) -> tuple[float, str]:
+        started = time.perf_counter()
+        try:
+            api_client.fetch_data(email, "hash", retry_policy=policy, url=url)
+        except api_client.ApiClientError as err:
+            return time.perf_counter() - started, type(err).__name__
+        return time.perf_counter() - started, "ok"
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for _ in range(args.rounds):
+            for latency, outcome in executor.map(one, accounts):
+                report.add(latency, outcome)
+    report.elapsed = time.perf_counter() - started
+    stats = api_client.resilience_diagnostics()
+    report.extra = {
+        "requests": stats["requests"],
+        "retries": stats["retries"],
+        "connections": stats["connections_opened"],
+    }
+    return report
+
+
+async def run_coordinator(
+    args: argparse.Namespace, url: str, accounts: list[str]
+) -> Report:
+    """Add every account through the config flow, then refresh all coordinators."""
+    try:
+        from homeassistant import bootstrap, loader
+        from homeassistant.runner import RuntimeConfig
+    except ImportError:
+        raise SystemExit("coordinator mode needs homeassistant installed") from None
+
+    domain = INTEGRATION_DIR.name
+    report = Report()
+    with tempfile.TemporaryDirectory() as config_dir:
+        custom = Path(config_dir) / "custom_components"
+        custom.mkdir()
+        (custom / domain).symlink_to(INTEGRATION_DIR, target_is_directory=True)
+        (Path(config_dir) / "configuration.yaml").write_text(
+            "homeassistant:\n"
+            "  time_zone: Europe/Berlin\n"
+            "recorder:\n"
+            "  db_url: 'sqlite://'\n"
+            "logger:\n"
+            "  default: warning\n"
+            f"{domain}:\n"
+            f"  max_concurrent_fetches: {args.concurrency}\n"
+            f"  max_requests_per_minute: {args.requests_per_minute or 600}\n",
+            encoding="utf-8",
+        )
+        hass = await bootstrap.async_setup_hass(
+            RuntimeConfig(config_dir=config_dir, skip_pip=True)
+        )
+        if hass is None:
+            raise SystemExit("Home Assistant failed to start")
+        await hass.async_start()
+
+        # The login URL is no setting of the integration; point the shared
+        # client at the stand-in and measure round trips, not its cache.
+        integration = await loader.async_get_integration(hass, domain)
+        hub = importlib.import_module(f"{integration.pkg_path}.hub").async_get_hub(hass)
+        hub.client.login_url = url
+        hub.client.cache_ttl = 0
+
+        setup_started = time.perf_counter()
+        for email in accounts:
+            flow = await hass.config_entries.flow.async_init(
+                domain, context={"source": "user"}
+            )
+            await hass.config_entries.flow.async_configure(
+                flow["flow_id"], {"email": email, "password_hash": "hash"}
+            )
+        await hass.async_block_till_done()
+        setup_time = time.perf_counter() - setup_started
+
+        coordinators = list(hass.data.get(domain, {}).values())
+
+        async def refresh(coordinator: Any) -> None:
+            await coordinator.async_refresh()
+            if not coordinator.last_update_success:
+                raise RuntimeError(str(coordinator.last_exception))
+
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            await asyncio.gather(*(
+                _timed(report, lambda coordinator=coordinator: refresh(coordinator))
+                for coordinator in coordinators
+            ))
+            await hass.async_block_till_done()
+        report.elapsed = time.perf_counter() - started
+        report.extra = {
+            "entries": f"{len(coordinators)} of {len(accounts)} set up "
+            f"in {setup_time:.2f} s",
+            "sensors": len(hass.states.async_entity_ids("sensor")),
+        }
+        await hass.async_stop()
+    return report
+
+
+def _start_standin(args: argparse.Namespace) -> tuple[subprocess.Popen[str], str]:
+    """Start the stand-in server in its own process and return its URL."""
+    command = [
+        sys.executable, str(Path(standin_server.__file__)), "--port", "0",
+        "--latency", str(args.latency), "--jitter", str(args.jitter),
+        "--error-rate", str(args.error_rate),
+        "--rate-limit-rate", str(args.rate_limit_rate),
+        "--auth-failure-rate", str(args.auth_failure_rate),
+        "--apartments", str(args.apartments), "--months", str(args.months),
+        "--seed", str(args.seed),
+    ]
+    if args.payload:
+        command += ["--payload", str(args.payload)]
+    if args.no_compress:
+        command.append("--no-compress")
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    assert process.stdout is not None
+    return process, process.stdout.readline().split()[-1]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.splitlines()[2:]),
+    )
+    parser.add_argument("mode", choices=("client", "sync", "coordinator"))
+    parser.add_argument("--accounts", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--retry-delay", type=float, default=0.05)
+    parser.add_argument(
+        "--requests-per-minute",
+        type=int,
+        help="rate cap of the client (coordinator mode: 600 unless given)",
+    )
+    parser.add_argument("--url", help="use a running stand-in instead of starting one")
+    parser.add_argument("--tracemalloc", action="store_true")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    standin_server.add_arguments(parser)
+    args = parser.parse_args()
+
+    accounts = [f"tenant{index}@example.com" for index in range(args.accounts)]
+    process = None
+    url = args.url
+    if url is None:
+        process, url = _start_standin(args)
+    if args.tracemalloc:
+        tracemalloc.start()
+    try:
+        if args.mode == "client":
+            report = asyncio.run(run_client(args, url, accounts))
+        elif args.mode == "sync":
+            report = run_sync(args, url, accounts)
+        else:
+            report = asyncio.run(run_coordinator(args, url, accounts))
+    finally:
+        if process is not None:
+            # SIGINT makes the stand-in print its status counts to stderr.
+            process.send_signal(signal.SIGINT)
+            process.wait()
+
+    if args.json:
+        print(json.dumps({
+            "mode": args.mode,
+            "fetches": len(report.latencies),
+            "elapsed": report.elapsed,
+            "p50": report.percentile(50),
+            "p90": report.percentile(90),
+            "p99": report.percentile(99),
+            "outcomes": dict(report.outcomes),
+            "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            **{key: str(value) for key, value in report.extra.items()},
+        }))
+    else:
+        report.print(args.mode)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
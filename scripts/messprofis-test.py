@@ -1,15 +1,136 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
+import math
 import os
+from pathlib import Path
 import sys
+import time
+from typing import Any
 
-from api_client import ApiAuthError, ApiClientError, extract_latest_values, fetch_data
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api_client import (  # noqa: E402
+    LOGIN_URL,
+    ApiAuthError,
+    ApiClientError,
+    extract_latest_values,
+    fetch_data,
+)
+
+DEFAULT_WORKERS = 8
+
+
+def _read_accounts(path: str) -> list[tuple[str, str]]:
+    """Read accounts as `email,password_hash` lines or NDJSON objects."""
+    accounts: list[tuple[str, str]] = []
+    with open(path, encoding="utf-8") as handle:
+        for number, line in enumerate(handle, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                item = json.loads(line)
+                email, password_hash = item["email"], item["password_hash"]
+            else:
+                email, _, password_hash = line.partition(",")
+            email, password_hash = email.strip(), password_hash.strip()
+            if not email or not password_hash:
+                raise ValueError(
+                    f"{path}:{number}: erwartet `email,password_hash`, "
+                    "E-Mail oder PasswordHash fehlt"
+                )
+            accounts.append((email, password_hash))
+    return accounts
+
+
+def _fetch_account(email: str, password_hash: str, url: str) -> dict[str, Any]:
+    """Fetch and summarize one account; never raises API errors."""
+    started = time.perf_counter()
+    record: dict[str, Any] = {"email": email}
+    try:
+        record["apartments"] = extract_latest_values(
+            fetch_data(email=email, password_hash=password_hash, url=url)
+        )
+        record["ok"] = True
+    except ApiAuthError as err:
+        record.update(ok=False, error="auth", message=str(err))
+    except ApiClientError as err:
+        record.update(ok=False, error="api", message=str(err))
+    record["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return record
+
+
+def _percentile(ordered: list[float], percent: float) -> float:
+    return ordered[max(1, math.ceil(percent / 100 * len(ordered))) - 1]
+
+
+def run_batch(path: str, workers: int, url: str) -> int:
+    """Fetch all accounts concurrently and stream one NDJSON line per account."""
+    try:
+        accounts = _read_accounts(path)
+    except ValueError as err:
+        print(f"Ungültige Kontendatei: {err}", file=sys.stderr)
+        return 2
+    started = time.perf_counter()
+    latencies: list[float] = []
+    failed = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_fetch_account, email, password_hash, url)
+            for email, password_hash in accounts
+        ]
+        for future in as_completed(futures):
+            record = future.result()
+            latencies.append(record["elapsed_ms"])
+            failed += not record["ok"]
+            print(json.dumps(record, ensure_ascii=False), flush=True)
+
+    elapsed = time.perf_counter() - started
+    summary: dict[str, Any] = {
+        "accounts": len(accounts),
+        "ok": len(accounts) - failed,
+        "failed": failed,
+        "workers": workers,
+        "elapsed_s": round(elapsed, 2),
+        "accounts_per_s": round(len(accounts) / elapsed, 2) if elapsed else None,
+    }
+    if latencies:
+        ordered = sorted(latencies)
+        summary["latency_ms"] = {
+            "p50": _percentile(ordered, 50),
+            "p90": _percentile(ordered, 90),
+            "p99": _percentile(ordered, 99),
+            "max": ordered[-1],
+        }
+    print(json.dumps(summary), file=sys.stderr)
+    return 0 if not failed else 5
 
 
 def main() -> int:
     """Simple CLI test script for the MessProfis API."""
+    parser = argparse.ArgumentParser(description="MessProfis API test client")
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Datei mit Konten (`email,password_hash` oder NDJSON pro Zeile)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"gleichzeitige Abrufe im Batch-Modus (Standard: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument("--url", default=LOGIN_URL, help="Login-Endpoint")
+    args = parser.parse_args()
+
+    if args.batch:
+        return run_batch(args.batch, max(1, args.workers), args.url)
+
     email = os.getenv("MESSPROFIS_EMAIL", "").strip()
     password_hash = os.getenv("MESSPROFIS_PASSWORD_HASH", "").strip()
 
@@ -21,7 +142,7 @@ def main() -> int:
         return 2
 
     try:
-        raw_data = fetch_data(email=email, password_hash=password_hash)
+        raw_data = fetch_data(email=email, password_hash=password_hash, url=args.url)
         summary = extract_latest_values(raw_data)
     except ApiAuthError as err:
         print(f"Auth-Fehler: {err}")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Generate synthetic MessProfis payloads for benchmarks and local testing."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+from typing import Any
+
+SUPPORTED_METRICS: tuple[str, ...] = (
+    "heizung",
+    "kaltwasser",
+    "warmwasser",
+    "warmwasserM3",
+)
+
+_INVALID_MONTHS: tuple[Any, ...] = (
+    None,
+    "n/a",
+    {"datum": "2024-02-30T00:00:00", "wert": 1.0},
+    {"datum": "kein Datum", "wert": 1.0},
+    {"datum": "2024-01-31T00:00:00", "wert": "n/a"},
+    {"datum": "2024-01-31T00:00:00"},
+    {"wert": 1.0},
+)
+
+
+def _month_date(month: int) -> str:
+    """Return the end-of-month style date the portal uses for month index n."""
+    year, month_of_year = 2020 + month // 12, month % 12 + 1
+    return f"{year}-{month_of_year:02d}-28T00:00:00"
+
+
+def _section(
+    rng: random.Random,
+    months: int,
+    base: float,
+    invalid_ratio: float,
+    estimate_ratio: float,
+) -> dict[str, Any]:
+    monate: list[Any] = []
+    for month in range(months):
+        if rng.random() < invalid_ratio:
+            monate.append(rng.choice(_INVALID_MONTHS))
+            continue
+        monate.append(
+            {
+                "datum": _month_date(month),
+                "wert": round(base * rng.uniform(0.5, 1.5), 2),
+                "enthaeltSchaetzung": rng.random() < estimate_ratio,
+                "vergleichswert": round(base, 2),
+            }
+        )
+    # The portal does not guarantee chronological order.
+    rng.shuffle(monate)
+    return {"jahreswert": round(base * 12, 2), "einheit": "", "monate": monate}
+
+
+def generate_payload(
+    apartments: int,
+    months: int = 24,
+    invalid_ratio: float = 0.02,
+    estimate_ratio: float = 0.1,
+    seed: int = 0,
+) -> list[dict[str, Any]]:
+    """Return a deterministic payload resembling a multi-unit account."""
+    rng = random.Random(seed)
+    payload: list[dict[str, Any]] = []
+    for index in range(1, apartments + 1):
+        payload.append(
+            {
+                "title1": f"Musterstraße {index // 20 + 1}",
+                "title2": f"Wohnung {index}",
+                "status": rng.choice(("aktiv", "aktiv", "aktiv", "ausgezogen")),
+                "werte": {
+                    metric: {
+                        "aktuell": _section(
+                            rng, months, rng.uniform(5, 500), invalid_ratio, estimate_ratio
+                        ),
+                        "vorjahr": _section(
+                            rng, months, rng.uniform(5, 500), invalid_ratio, estimate_ratio
+                        ),
+                    }
+                    for metric in SUPPORTED_METRICS
+                },
+            }
+        )
+    return payload
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--apartments", type=int, default=10)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--invalid-ratio", type=float, default=0.02)
+    parser.add_argument("--estimate-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    payload = generate_payload(
+        args.apartments,
+        months=args.months,
+        invalid_ratio=args.invalid_ratio,
+        estimate_ratio=args.estimate_ratio,
+        seed=args.seed,
+    )
+    json.dump(payload, sys.stdout, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Local stand-in for the MessProfis login endpoint.
+
+Serves POST /api/Mieter/Login with a recorded payload file or a synthetic
+payload per account, with configurable latency, server errors, rate limits
+and authentication failures. Point a client at it with
+
+    python3 scripts/messprofis-test.py --url http://127.0.0.1:8765/api/Mieter/Login
+
+Accounts whose e-mail starts with "unauthorized" always get 401, "forbidden"
+always gets 403; every other account is accepted.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+import gzip
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from pathlib import Path
+import random
+import sys
+import threading
+import time
+import zlib
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from payload_generator import generate_payload  # noqa: E402
+
+LOGIN_PATH = "/api/Mieter/Login"
+PAYLOAD_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class StandinConfig:
+    """Behaviour of the stand-in server."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    auth_failure_rate: float = 0.0
+    apartments: int = 10
+    months: int = 24
+    payload: bytes | None = None
+    compress: bool = True
+    seed: int = 0
+
+
+class StandinServer(ThreadingHTTPServer):
+    """Threaded keep-alive server holding the configuration and counters."""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address: tuple[str, int], config: StandinConfig) -> None:
+        super().__init__(address, StandinHandler)
+        self.config = config
+        self.statuses: Counter[int] = Counter()
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(config.seed)
+        self._payloads: OrderedDict[str, tuple[bytes, bytes]] = OrderedDict()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{LOGIN_PATH}"
+
+    def random(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def record(self, status: int, size: int) -> None:
+        with self._lock:
+            self.statuses[status] += 1
+            self.bytes_sent += size
+
+    def payload_for(self, email: str) -> tuple[bytes, bytes]:
+        """Return the plain and gzip encoded body of an account."""
+        with self._lock:
+            if (cached := self._payloads.get(email)) is not None:
+                self._payloads.move_to_end(email)
+                return cached
+        if self.config.payload is not None:
+            body = self.config.payload
+        else:
+            # Every account gets its own, but reproducible, readings.
+            body = json.dumps(
+                generate_payload(
+                    self.config.apartments,
+                    months=self.config.months,
+                    seed=zlib.crc32(email.encode("utf-8")) ^ self.config.seed,
+                ),
+                ensure_ascii=False,
+            ).encode("utf-8")
+        encoded = (body, gzip.compress(body, compresslevel=6))
+        with self._lock:
+            self._payloads[email] = encoded
+            if len(self._payloads) > PAYLOAD_CACHE_SIZE:
+                self._payloads.popitem(last=False)
+        return encoded
+
+    def as_dict(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "requests": sum(self.statuses.values()),
+                "statuses": dict(sorted(self.statuses.items())),
+                "bytes_sent": self.bytes_sent,
+            }
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Answer login requests the way the portal does."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; avoid Nagle stalls on reuse.
+    disable_nagle_algorithm = True
+    server: StandinServer
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path != LOGIN_PATH:
+            self._send(404)
+            return
+        try:
+            login = json.loads(body)
+            email = str(login["Mail"]).lower()
+            login["PasswordHash"]
+        except (ValueError, KeyError, TypeError):
+            self._send(400)
+            return
+
+        config = self.server.config
+        delay = config.latency + config.jitter * self.server.random()
+        if delay > 0:
+            time.sleep(delay)
+
+        if email.startswith("unauthorized"):
+            self._send(401)
+        elif email.startswith("forbidden"):
+            self._send(403)
+        elif self.server.random() < config.auth_failure_rate:
+            self._send(401)
+        elif self.server.random() < config.error_rate:
+            self._send(503)
+        elif self.server.random() < config.rate_limit_rate:
+            self._send(429, headers={"Retry-After": "1"})
+        else:
+            plain, compressed = self.server.payload_for(email)
+            if config.compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+                self._send(200, compressed, {"Content-Encoding": "gzip"})
+            else:
+                self._send(200, plain)
+
+    def _send(
+        self, status: int, body: bytes = b"", headers: dict[str, str] | None = None
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.record(status, len(body))
+
+
+def start_server(
+    config: StandinConfig, host: str = "127.0.0.1", port: int = 0
+) -> StandinServer:
+    """Start the stand-in on a background thread and return it."""
+    server = StandinServer((host, port), config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the stand-in behaviour options to a command line parser."""
+    group = parser.add_argument_group("stand-in server")
+    group.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    group.add_argument("--jitter", type=float, default=0.0, help="extra random seconds")
+    group.add_argument("--error-rate", type=float, default=0.0, help="share of 503s")
+    group.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of 429s")
+    group.add_argument(
+        "--auth-failure-rate", type=float, default=0.0, help="share of random 401s"
+    )
+    group.add_argument("--apartments", type=int, default=10)
+    group.add_argument("--months", type=int, default=24)
+    group.add_argument("--payload", type=Path, help="recorded payload JSON to serve")
+    group.add_argument("--no-compress", action="store_true")
+    group.add_argument("--seed", type=int, default=0)
+
+
+def config_from_args(args: argparse.Namespace) -> StandinConfig:
+    """Build the stand-in configuration from parsed command line options."""
+    return StandinConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        auth_failure_rate=args.auth_failure_rate,
+        apartments=args.apartments,
+        months=args.months,
+        payload=args.payload.read_bytes() if args.payload else None,
+        compress=not args.no_compress,
+        seed=args.seed,
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = StandinServer((args.host, args.port), config_from_args(args))
+    print(f"Serving {server.url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.as_dict()), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
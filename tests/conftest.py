@@ -0,0 +1,20 @@
+"""Shared setup for the integration tests.
+
+The package __init__ needs Home Assistant, so the package is registered
+without executing it; the modules under test import cleanly on their own.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import types
+
+INTEGRATION_DIR = (
+    Path(__file__).resolve().parent.parent / "custom_components" / "messprofis_mieterportal"
+)
+
+if INTEGRATION_DIR.name not in sys.modules:
+    package = types.ModuleType(INTEGRATION_DIR.name)
+    package.__path__ = [str(INTEGRATION_DIR)]
+    sys.modules[INTEGRATION_DIR.name] = package
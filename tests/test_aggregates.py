@@ -0,0 +1,152 @@
+"""Tests for the incremental consumption aggregates."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from messprofis_mieterportal.aggregates import ConsumptionEngine
+from messprofis_mieterportal.const import METRIC_HEATING, SUPPORTED_METRICS
+from messprofis_mieterportal.models import (
+    NO_MONTHS,
+    ApartmentReading,
+    MonthlySeries,
+    MonthlyValue,
+)
+
+HEATING = SUPPORTED_METRICS.index(METRIC_HEATING)
+
+
+def _series(months: list[tuple[str, float]]) -> MonthlySeries:
+    return MonthlySeries.from_values(
+        MonthlyValue(datum, wert, False) for datum, wert in months
+    )
+
+
+def _reading(
+    months: list[tuple[str, float]], annual: float | None = 1200.0
+) -> ApartmentReading:
+    series = [NO_MONTHS] * len(SUPPORTED_METRICS)
+    series[HEATING] = _series(months)
+    annuals: list[float | None] = [None] * len(SUPPORTED_METRICS)
+    annuals[HEATING] = annual
+    return ApartmentReading(
+        apartment_key="wohnung",
+        title1="Haus",
+        title2="Wohnung",
+        status=None,
+        latest=(None,) * len(SUPPORTED_METRICS),
+        annual=tuple(annuals),
+        series=tuple(series),
+    )
+
+
+def _months(
+    first_year: int, first_month: int, values: list[float]
+) -> list[tuple[str, float]]:
+    months = []
+    index = first_year * 12 + first_month - 1
+    for offset, value in enumerate(values):
+        year, month = divmod(index + offset, 12)
+        months.append((f"{year}-{month + 1:02d}-28T00:00:00", value))
+    return months
+
+
+def _expected(months: list[tuple[str, float]], annual: float | None) -> tuple:
+    """Compute the figures from scratch, the slow and obvious way."""
+    indices = [
+        (parsed := datetime.fromisoformat(datum)).year * 12 + parsed.month - 1
+        for datum, _ in months
+    ]
+    values = [wert for _, wert in months]
+    latest = indices[-1]
+    rolling = sum(v for i, v in zip(indices, values) if i >= latest - 11)
+    return (
+        months[-1][0],
+        (
+            values[-1] - values[-2]
+            if len(indices) > 1 and indices[-2] == latest - 1
+            else None
+        ),
+        sum(v for i, v in zip(indices, values) if i >= latest - latest % 12),
+        rolling,
+        round(rolling / annual * 100, 1) if annual else None,
+    )
+
+
+def _heating(engine: ConsumptionEngine, reading: ApartmentReading) -> tuple | None:
+    aggregates = engine.update(reading)[HEATING]
+    return None if aggregates is None else tuple(aggregates)
+
+
+def test_appended_month_only_sums_the_new_month() -> None:
+    engine = ConsumptionEngine()
+    months = _months(2023, 3, [10.0 * value for value in range(1, 13)])
+    assert _heating(engine, _reading(months)) == pytest.approx(_expected(months, 1200.0))
+    assert engine.months_processed == 12
+
+    months = months + _months(2024, 3, [5.5])
+    assert _heating(engine, _reading(months)) == pytest.approx(_expected(months, 1200.0))
+    assert engine.months_processed == 13
+
+
+def test_revised_month_recomputes_from_that_month_on() -> None:
+    engine = ConsumptionEngine()
+    months = _months(2023, 11, [1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+    _heating(engine, _reading(months))
+
+    months[3] = (months[3][0], 40.0)
+    assert _heating(engine, _reading(months)) == pytest.approx(_expected(months, 1200.0))
+    assert engine.months_processed == 6 + 3
+
+
+def test_removed_months() -> None:
+    engine = ConsumptionEngine()
+    months = _months(2023, 6, [float(value) for value in range(1, 16)])
+    _heating(engine, _reading(months))
+
+    # The newest month was withdrawn.
+    shorter = months[:-1]
+    assert _heating(engine, _reading(shorter)) == pytest.approx(_expected(shorter, 1200.0))
+    # A month in the middle went missing; there is no previous month anymore.
+    gap = shorter[:-2] + shorter[-1:]
+    assert _heating(engine, _reading(gap)) == pytest.approx(_expected(gap, 1200.0))
+    assert _heating(engine, _reading(gap))[1] is None
+
+    assert _heating(engine, _reading([])) is None
+
+
+def test_annual_value_change_only_updates_the_percentage() -> None:
+    engine = ConsumptionEngine()
+    first = _reading(_months(2024, 1, [100.0, 200.0]), annual=600.0)
+    assert engine.update(first)[HEATING].jahreswert_percent == 50.0
+    processed = engine.months_processed
+
+    # The identical series with a new annual value: nothing is summed again.
+    second = _reading([], annual=300.0)
+    second.series = first.series
+    assert engine.update(second)[HEATING].jahreswert_percent == 100.0
+    assert engine.months_processed == processed
+
+
+def test_undatable_months_are_left_out() -> None:
+    engine = ConsumptionEngine()
+    months = _months(2024, 1, [1.0, 2.0, 3.0])
+    with_bad = months[:2] + [("kein Datum", 100.0)] + months[2:]
+    assert _heating(engine, _reading(with_bad)) == pytest.approx(_expected(months, 1200.0))
+
+
+def test_unselected_metrics_and_forgotten_apartments_drop_their_state() -> None:
+    engine = ConsumptionEngine()
+    reading = _reading(_months(2024, 1, [1.0, 2.0]))
+    engine.update(reading)
+    assert len(engine) == len(SUPPORTED_METRICS)
+
+    aggregates = engine.update(reading, metrics=())
+    assert aggregates == (None,) * len(SUPPORTED_METRICS)
+    assert len(engine) == 0
+
+    engine.update(reading)
+    engine.forget(["wohnung"])
+    assert len(engine) == 0
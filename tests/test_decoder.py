@@ -0,0 +1,165 @@
+"""Tests for the incremental response decoders."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import zlib
+
+import pytest
+
+from messprofis_mieterportal.decoder import (
+    ContentDecoder,
+    PayloadStreamDecoder,
+    decode_payload,
+)
+
+PAYLOAD = [
+    {
+        "title1": "Haus",
+        "title2": "Wohnung 1",
+        "status": "aktiv",
+        "bild": "x" * 200,
+        "werte": {
+            "heizung": {
+                "aktuell": {
+                    "jahreswert": 1200.5,
+                    "monate": [
+                        {
+                            "datum": "2024-01-31T00:00:00",
+                            "wert": 100.0,
+                            "enthaeltSchaetzung": False,
+                            "vergleichswert": 90.0,
+                        }
+                    ],
+                    "einheit": "kWh",
+                },
+                "vorjahr": {"monate": []},
+            },
+            "strom": {"aktuell": {"monate": []}},
+        },
+    },
+    {"title1": "Haus ä", "title2": "Wohnung 2", "werte": {}},
+]
+BODY = json.dumps(PAYLOAD, ensure_ascii=False).encode("utf-8")
+PRUNED = [
+    {
+        "title1": "Haus",
+        "title2": "Wohnung 1",
+        "status": "aktiv",
+        "werte": {
+            "heizung": {
+                "aktuell": {
+                    "monate": [
+                        {
+                            "datum": "2024-01-31T00:00:00",
+                            "wert": 100.0,
+                            "enthaeltSchaetzung": False,
+                        }
+                    ],
+                    "jahreswert": 1200.5,
+                }
+            }
+        },
+    },
+    {"title1": "Haus ä", "title2": "Wohnung 2", "werte": {}},
+]
+
+
+def _raw_deflate(data: bytes) -> bytes:
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _decode(encoding: str, body: bytes, chunk_size: int) -> bytes:
+    content = ContentDecoder(encoding)
+    decoded = b"".join(
+        content.decompress(body[start : start + chunk_size])
+        for start in range(0, len(body), chunk_size)
+    )
+    decoded += content.flush()
+    assert content.wire_bytes == len(body)
+    return decoded
+
+
+@pytest.mark.parametrize(
+    ("encoding", "body"),
+    [
+        ("identity", BODY),
+        ("gzip", gzip.compress(BODY)),
+        ("deflate", zlib.compress(BODY)),
+        ("deflate", _raw_deflate(BODY)),
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 1 << 16])
+def test_content_decoder_handles_any_split(
+    encoding: str, body: bytes, chunk_size: int
+) -> None:
+    assert _decode(encoding, body, chunk_size) == BODY
+
+
+def test_raw_deflate_with_empty_first_chunk() -> None:
+    body = _raw_deflate(BODY)
+    content = ContentDecoder("deflate")
+    decoded = content.decompress(b"") + content.decompress(body[:1])
+    decoded += content.decompress(body[1:]) + content.flush()
+    assert decoded == BODY
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "deflate"])
+def test_content_decoder_rejects_garbage(encoding: str) -> None:
+    content = ContentDecoder(encoding)
+    with pytest.raises(ValueError):
+        content.decompress(b"this is not compressed at all")
+        content.flush()
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "deflate"])
+def test_content_decoder_rejects_truncated_body(encoding: str) -> None:
+    body = gzip.compress(BODY) if encoding == "gzip" else zlib.compress(BODY)
+    content = ContentDecoder(encoding)
+    content.decompress(body[: len(body) // 2])
+    with pytest.raises(ValueError):
+        content.flush()
+
+
+def test_content_decoder_rejects_unknown_encoding() -> None:
+    with pytest.raises(ValueError):
+        ContentDecoder("compress")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64, 1 << 16])
+def test_stream_decoder_prunes_any_split(chunk_size: int) -> None:
+    assert decode_payload(BODY, chunk_size=chunk_size) == PRUNED
+
+
+def test_stream_decoder_digest_and_size() -> None:
+    decoder = PayloadStreamDecoder()
+    for start in range(0, len(BODY), 5):
+        decoder.feed(BODY[start : start + 5])
+    decoder.finish()
+    assert decoder.bytes_read == len(BODY)
+    assert decoder.digest == hashlib.sha256(BODY).hexdigest()
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"",
+        b"{}",
+        b"[1, 2]",
+        b'[{"title1": "a"}',
+        b'[{"title1": "a"} {"title1": "b"}]',
+        b'[{"title1": "a"}] []',
+        b"[{]",
+        b"\xff\xfe[]",
+    ],
+)
+def test_stream_decoder_rejects_garbage(body: bytes) -> None:
+    with pytest.raises(ValueError):
+        decode_payload(body, chunk_size=2)
+
+
+def test_stream_decoder_accepts_empty_list() -> None:
+    assert decode_payload(b" [ ] ", chunk_size=1) == []
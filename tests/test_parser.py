@@ -0,0 +1,85 @@
+"""Tests for the payload parser."""
+
+from __future__ import annotations
+
+from messprofis_mieterportal.parser import (
+    extract_apartment_readings,
+    get_latest_month_value,
+    get_monthly_series,
+)
+
+
+def _month(datum: str, wert: object, estimated: bool = False) -> dict[str, object]:
+    return {"datum": datum, "wert": wert, "enthaeltSchaetzung": estimated}
+
+
+def test_series_is_sorted_and_skips_invalid_entries() -> None:
+    section = {
+        "monate": [
+            _month("2024-03-31T00:00:00", 3.0),
+            _month("2024-02-30T00:00:00", 9.0),
+            _month("2024-01-31T00:00:00", 1.0, estimated=True),
+            _month("kein Datum", 9.0),
+            _month("2024-02-29T00:00:00", "n/a"),
+            {"wert": 9.0},
+            None,
+        ]
+    }
+
+    series = get_monthly_series(section)
+
+    assert [(month.datum, month.wert, month.estimated) for month in series] == [
+        ("2024-01-31T00:00:00", 1.0, True),
+        ("2024-03-31T00:00:00", 3.0, False),
+    ]
+    assert get_latest_month_value(section) == series[-1]
+
+
+def test_duplicate_dates_keep_the_first_valid_entry() -> None:
+    section = {
+        "monate": [
+            _month("2024-02-29T00:00:00", "n/a"),
+            _month("2024-02-29T00:00:00", 1.0),
+            _month("2024-01-31T00:00:00", 5.0),
+            _month("2024-02-29", 2.0, estimated=True),
+        ]
+    }
+
+    series = get_monthly_series(section)
+
+    assert [(month.datum, month.wert) for month in series] == [
+        ("2024-01-31T00:00:00", 5.0),
+        ("2024-02-29T00:00:00", 1.0),
+    ]
+    assert series.estimated == 0
+    assert get_latest_month_value(section) == series[-1]
+
+
+def test_latest_value_is_the_newest_series_entry() -> None:
+    payload = [
+        {
+            "title1": "Haus",
+            "title2": "Wohnung 1",
+            "werte": {
+                "heizung": {
+                    "aktuell": {
+                        "jahreswert": "120.5",
+                        "monate": [
+                            _month("2024-02-29T00:00:00", 2.0),
+                            _month("2024-02-29T00:00:00", 7.0),
+                            _month("2024-01-31T00:00:00", 1.0),
+                        ],
+                    }
+                },
+                "kaltwasser": {"aktuell": {"monate": "n/a"}},
+            },
+        }
+    ]
+
+    (reading,) = extract_apartment_readings(payload)
+
+    assert reading.value("heizung") == reading.history("heizung")[-1]
+    assert reading.value("heizung").wert == 2.0
+    assert reading.jahreswert("heizung") == 120.5
+    assert reading.value("kaltwasser") is None
+    assert len(reading.history("kaltwasser")) == 0
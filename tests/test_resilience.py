@@ -0,0 +1,105 @@
+"""Tests for the circuit breaker and the rate limiter."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from messprofis_mieterportal import resilience
+from messprofis_mieterportal.resilience import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    RateLimiter,
+)
+
+
+class FakeClock:
+    """Monotonic clock that only moves when told to."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_at_the_threshold() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60, clock=clock)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+
+    assert breaker.state == STATE_OPEN
+    assert not breaker.allow_request()
+    assert breaker.rejected == 1
+
+
+def test_breaker_probe_closes_or_reopens() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60, clock=clock)
+    breaker.record_failure()
+
+    clock.now += 60
+    assert breaker.allow_request()
+    assert breaker.state == STATE_HALF_OPEN
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert not breaker.allow_request()
+
+    clock.now += 60
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.opened == 2
+
+
+def test_breaker_half_open_probe_expires() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60, clock=clock)
+    breaker.record_failure()
+    clock.now += 60
+    assert breaker.allow_request()
+
+    # The probe never reports an outcome, e.g. because it was cancelled.
+    clock.now += 59
+    assert not breaker.allow_request()
+    clock.now += 1
+    assert breaker.allow_request()
+    assert breaker.state == STATE_HALF_OPEN
+
+
+def test_rate_limiter_refills_at_the_configured_rate(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    clock = FakeClock()
+    sleeps: list[float] = []
+
+    async def fake_sleep(delay: float) -> None:
+        sleeps.append(delay)
+        clock.now += delay
+
+    monkeypatch.setattr(resilience.asyncio, "sleep", fake_sleep)
+    limiter = RateLimiter(requests_per_minute=60, burst=2, clock=clock)
+
+    async def run() -> None:
+        await limiter.acquire()
+        await limiter.acquire()
+        assert sleeps == []
+        await limiter.acquire()
+        assert sleeps == [pytest.approx(1.0)]
+
+        # A long pause refills the bucket only up to the burst.
+        clock.now += 3600
+        for _ in range(3):
+            await limiter.acquire()
+        assert sleeps == [pytest.approx(1.0), pytest.approx(1.0)]
+
+    asyncio.run(run())
+    assert limiter.delayed == 2
+    assert limiter.waited == pytest.approx(2.0)
@@ -0,0 +1,80 @@
+"""Tests for the statistics import watermark."""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("homeassistant.components.recorder")
+
+from messprofis_mieterportal.models import MonthlySeries, MonthlyValue  # noqa: E402
+from messprofis_mieterportal.statistics import _rows_to_import  # noqa: E402
+
+JAN, FEB, MAR, APR = (
+    "2024-01-31T00:00:00",
+    "2024-02-29T00:00:00",
+    "2024-03-31T00:00:00",
+    "2024-04-30T00:00:00",
+)
+
+
+def _series(*months: tuple[str, float, bool]) -> MonthlySeries:
+    return MonthlySeries.from_values(MonthlyValue(*month) for month in months)
+
+
+def _keys(rows: list[tuple[str, MonthlyValue]]) -> list[str]:
+    return [key for key, _ in rows]
+
+
+def test_everything_is_imported_the_first_time() -> None:
+    series = _series((JAN, 1.0, False), (FEB, 2.0, True))
+
+    assert _rows_to_import(series, {}) == (JAN, list(zip([JAN, FEB], series)))
+
+
+def test_only_new_months_after_the_watermark() -> None:
+    series = _series((JAN, 1.0, False), (FEB, 2.0, False), (MAR, 3.0, False))
+    imported = {JAN: [1.0, False, 1.0], FEB: [2.0, False, 3.0]}
+
+    restart, rows = _rows_to_import(series, imported)
+
+    assert restart == MAR
+    assert _keys(rows) == [MAR]
+
+
+def test_nothing_to_import_when_unchanged() -> None:
+    series = _series((JAN, 1.0, False), (FEB, 2.0, True))
+    imported = {JAN: [1.0, False, 1.0], FEB: [2.0, True, 3.0]}
+
+    assert _rows_to_import(series, imported) == (None, [])
+
+
+def test_estimate_flag_flip_reimports_from_that_month() -> None:
+    series = _series(
+        (JAN, 1.0, False), (FEB, 2.5, False), (MAR, 3.0, True), (APR, 4.0, True)
+    )
+    imported = {
+        JAN: [1.0, False, 1.0],
+        FEB: [2.0, True, 3.0],
+        MAR: [3.0, True, 6.0],
+    }
+
+    restart, rows = _rows_to_import(series, imported)
+
+    # February is no longer estimated; its sum and every later one change.
+    assert restart == FEB
+    assert _keys(rows) == [FEB, MAR, APR]
+    assert rows[0][1].wert == 2.5
+
+
+def test_flip_to_estimated_counts_as_well() -> None:
+    series = _series((JAN, 1.0, True), (FEB, 2.0, False))
+    imported = {JAN: [1.0, False, 1.0], FEB: [2.0, False, 3.0]}
+
+    assert _keys(_rows_to_import(series, imported)[1]) == [JAN, FEB]
+
+
+def test_unknown_months_before_the_watermark_are_ignored() -> None:
+    series = _series((JAN, 1.0, False), (FEB, 2.0, False), (MAR, 3.0, False))
+    imported = {FEB: [2.0, False, 2.0], MAR: [3.0, False, 5.0]}
+
+    assert _rows_to_import(series, imported) == (None, [])